@@ -0,0 +1,87 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+from dify_plugin import Endpoint
+from werkzeug import Request, Response
+from tools._updates import RecentUpdateIds, compact_update
+import hmac
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# App id -> recently accepted update_ids
+_recent: Dict[str, RecentUpdateIds] = {}
+_recent_lock = threading.Lock()
+
+
+def _recent_for(app_id: str) -> RecentUpdateIds:
+    with _recent_lock:
+        recent = _recent.get(app_id)
+        if recent is None:
+            recent = _recent[app_id] = RecentUpdateIds()
+        return recent
+
+
+def workflow_inputs(update: Dict[str, Any], body: str) -> Dict[str, Any]:
+    """
+    Workflow inputs for an update: its compact fields plus the raw JSON as
+    update. Ids are passed as strings, since workflow text inputs reject numbers
+    """
+    compact = {
+        key: str(value) if isinstance(value, int) else value
+        for key, value in compact_update(update).items()
+    }
+    return {**compact, "update": body}
+
+
+class TelegramWebhookEndpoint(Endpoint):
+    def _invoke(self, r: Request, values: Mapping, settings: Mapping) -> Response:
+        """
+        Receive a Telegram webhook update and run the configured workflow with it.
+        Telegram gets its 200 right away; the workflow runs while the body streams
+        """
+        secret_token = settings.get("secret_token")
+        if not secret_token:
+            # Without it anyone who learns the URL could feed updates to the workflow
+            return Response("no secret token configured", status=500, content_type="text/plain")
+        received = r.headers.get(SECRET_TOKEN_HEADER, "")
+        if not hmac.compare_digest(received.encode("utf-8"), secret_token.encode("utf-8")):
+            return Response("invalid secret token", status=403, content_type="text/plain")
+
+        app = settings.get("app") or {}
+        app_id = app.get("app_id") if isinstance(app, Mapping) else app
+        if not app_id:
+            return Response("no workflow configured", status=500, content_type="text/plain")
+
+        body = r.get_data(as_text=True)
+        try:
+            update = json.loads(body)
+            update_id = int(update["update_id"])
+        except (ValueError, TypeError, KeyError):
+            return Response("invalid update", status=400, content_type="text/plain")
+
+        recent = _recent_for(app_id)
+        if not recent.add(update_id):
+            # Redelivery of an update already accepted
+            return Response("ok", status=200, content_type="text/plain")
+
+        return Response(
+            self._run_workflow(app_id, update_id, workflow_inputs(update, body)),
+            status=200, content_type="text/plain"
+        )
+
+    def _run_workflow(self, app_id: str, update_id: int, inputs: Dict[str, Any]) -> Iterator[str]:
+        """
+        Body of the answer. The plugin runtime sends status and headers as soon as
+        it sees a generator body and keeps the session open while it runs, so the
+        workflow runs after the answer without holding up the delivery
+        """
+        yield "ok"
+        try:
+            self.session.app.workflow.invoke(app_id=app_id, inputs=inputs, response_mode="blocking")
+        except Exception as e:
+            # Not redelivered: a workflow that fails on an update would fail on it again
+            logger.error(f"Error running workflow for update {update_id}: {str(e)}")
@@ -1,9 +1,8 @@
 from typing import Any
 from dify_plugin import ToolProvider
 from dify_plugin.errors.tool import ToolProviderCredentialValidationError
-from telegram import Bot
-from telegram.error import TelegramError
-import asyncio
+from telegram.error import InvalidToken, TelegramError
+from tools._helpers import get_bot, run_async
 
 
 class TelegramProvider(ToolProvider):
@@ -11,38 +10,28 @@ class TelegramProvider(ToolProvider):
         """
         Validate Telegram Bot Token by making a test API call
         """
+        bot_token = None
         try:
             bot_token = credentials.get("bot_token")
 
             if not bot_token:
                 raise ToolProviderCredentialValidationError("Bot token is required")
 
-            # Test the token by getting bot info
-            async def test_token():
-                bot = Bot(token=bot_token)
-                try:
-                    await bot.get_me()
-                    return True
-                except TelegramError as e:
-                    raise ToolProviderCredentialValidationError(f"Invalid bot token: {str(e)}")
-                finally:
-                    # Clean up
-                    if hasattr(bot, 'shutdown'):
-                        await bot.shutdown()
-
-            # Run async validation
+            # Test the token by getting bot info. A bot already in the pool was
+            # initialized earlier, so call getMe again to catch revoked tokens
             try:
-                asyncio.run(test_token())
-            except RuntimeError:
-                # If event loop is already running, create new loop
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    loop.run_until_complete(test_token())
-                finally:
-                    loop.close()
+                bot = get_bot(credentials)
+                run_async(bot.get_me())
+            except InvalidToken:
+                # Its message quotes the token
+                raise ToolProviderCredentialValidationError("Invalid bot token: rejected by Telegram")
+            except TelegramError as e:
+                raise ToolProviderCredentialValidationError(
+                    f"Invalid bot token: {str(e).replace(bot_token, '***')}"
+                )
 
         except ToolProviderCredentialValidationError:
             raise
         except Exception as e:
-            raise ToolProviderCredentialValidationError(f"Validation failed: {str(e)}")
+            message = str(e).replace(bot_token, '***') if bot_token else str(e)
+            raise ToolProviderCredentialValidationError(f"Validation failed: {message}")
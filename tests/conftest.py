@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tools import each other as tools.<module>, relative to the plugin root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,60 @@
+from tools import _bot_pool
+from tools._bot_pool import BotPool, PooledBot, _PoolEntry
+import asyncio
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(_bot_pool, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def add_bot(pool: BotPool, loop, token: str) -> PooledBot:
+    bot = PooledBot(token=token)
+    pool._entries[bot.key] = _PoolEntry(bot=bot, loop=loop, last_used=_bot_pool.time.monotonic())
+    return bot
+
+
+def test_idle_bot_is_evicted(clock, loop):
+    pool = BotPool(idle_timeout=600)
+    add_bot(pool, loop, "1:idle")
+    clock.now += 599
+    assert pool.evict_idle() == 0
+    clock.now += 2
+    assert pool.evict_idle() == 1
+    assert len(pool) == 0
+
+
+def test_bot_in_use_across_the_sweep_is_kept(clock, loop):
+    pool = BotPool(idle_timeout=600)
+    bot = add_bot(pool, loop, "1:busy")
+
+    async def long_job():
+        async with bot.in_use():
+            # A broadcast still sending long after the bot was acquired
+            clock.now += 1800
+            assert pool.evict_idle() == 0
+
+    loop.run_until_complete(long_job())
+    # Idle time counts from the end of the last call, not from acquire
+    clock.now += 599
+    assert pool.evict_idle() == 0
+    clock.now += 2
+    assert pool.evict_idle() == 1
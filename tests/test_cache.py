@@ -0,0 +1,75 @@
+from tools import _cache
+from tools._cache import TTLCache
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(_cache, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(ttl=10, max_entries=10)
+    cache.set("chat", 1)
+    clock.now += 9.9
+    assert cache.get("chat") == 1
+    clock.now += 0.1
+    assert cache.get("chat") is None
+    # Expired entries are dropped on lookup
+    assert len(cache) == 0
+
+
+def test_max_age_is_stricter_per_lookup(clock):
+    cache = TTLCache(ttl=10, max_entries=10)
+    cache.set("chat", 1)
+    clock.now += 5
+    assert cache.get("chat", max_age=3) is None
+    # A stricter lookup doesn't evict what is still fresh for others
+    assert cache.get("chat") == 1
+    assert cache.get("chat", max_age=0) is None
+    # max_age can't extend the TTL
+    clock.now += 6
+    assert cache.get("chat", max_age=60) is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(ttl=10, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b", "missing") == "missing"
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_set_refreshes_timestamp(clock):
+    cache = TTLCache(ttl=10, max_entries=10)
+    cache.set("a", 1)
+    clock.now += 8
+    cache.set("a", 2)
+    clock.now += 8
+    assert cache.get("a") == 2
+
+
+def test_pop_clear_and_stats(clock):
+    cache = TTLCache(ttl=10, max_entries=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "gone") == "gone"
+    assert cache.get("b") == 2
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,83 @@
+from tools._file_cache import FileCache
+import os
+import pytest
+
+
+def store(cache: FileCache, unique_id: str, data: bytes) -> bool:
+    with cache.writer(unique_id) as writer:
+        writer.write(data)
+        return writer.commit()
+
+
+def read(cache: FileCache, unique_id: str, block_size: int = 4) -> bytes:
+    return b"".join(cache.iter_blocks(unique_id, block_size))
+
+
+def test_evicts_least_recently_used_by_total_bytes(tmp_path):
+    cache = FileCache(str(tmp_path), max_bytes=10)
+    assert store(cache, "a", b"1234")
+    assert store(cache, "b", b"5678")
+    assert cache.size_of("a") == 4
+    assert store(cache, "c", b"90ab")
+    # b was the least recently used once a was read
+    assert cache.size_of("b") is None
+    assert sorted(os.listdir(tmp_path)) == ["a", "c"]
+    assert cache.stats()["total_bytes"] == 8
+    assert read(cache, "a") == b"1234"
+
+
+def test_file_larger_than_the_cache_is_not_committed(tmp_path):
+    cache = FileCache(str(tmp_path), max_bytes=3)
+    with cache.writer("big") as writer:
+        writer.write(b"12345")
+        assert not writer.commit()
+        assert b"".join(writer.iter_written(2)) == b"12345"
+    assert os.listdir(tmp_path) == []
+
+
+def test_uncommitted_write_is_discarded_on_exit(tmp_path):
+    cache = FileCache(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        with cache.writer("a") as writer:
+            writer.write(b"partial")
+            raise RuntimeError("download failed")
+    assert os.listdir(tmp_path) == []
+    assert cache.size_of("a") is None
+
+
+def test_reload_orders_by_mtime_and_drops_partial_writes(tmp_path):
+    for name, mtime in (("old", 100), ("new", 300), ("mid", 200)):
+        path = tmp_path / name
+        path.write_bytes(b"xxxx")
+        os.utime(path, (mtime, mtime))
+    (tmp_path / "mid.abc.part").write_bytes(b"xx")
+    (tmp_path / "not a file id").write_bytes(b"xx")
+
+    # Only 8 of the 12 bytes fit: the least recently used file goes first
+    cache = FileCache(str(tmp_path), max_bytes=8)
+    assert cache.stats()["files"] == 2
+    assert cache.size_of("old") is None
+    assert cache.size_of("mid") == 4 and cache.size_of("new") == 4
+    assert sorted(os.listdir(tmp_path)) == ["mid", "new", "not a file id"]
+
+
+def test_invalid_unique_id_never_becomes_a_path(tmp_path):
+    cache = FileCache(str(tmp_path))
+    for unique_id in ("../escape", "a/b", "", "x" * 129):
+        with pytest.raises(ValueError):
+            cache.writer(unique_id)
+    assert os.listdir(tmp_path) == []
+
+
+def test_empty_file_is_served_without_mapping(tmp_path):
+    cache = FileCache(str(tmp_path))
+    assert store(cache, "empty", b"")
+    assert cache.size_of("empty") == 0
+    assert list(cache.iter_blocks("empty")) == []
+
+
+def test_disabled_cache_stores_nothing():
+    cache = FileCache(None)
+    assert not cache.enabled
+    assert not store(cache, "a", b"data")
+    assert cache.size_of("a") is None
@@ -0,0 +1,82 @@
+from telegram import InlineQueryResultArticle, InlineQueryResultCachedPhoto, InlineQueryResultPhoto
+from tools._cache import inline_index_cache
+from tools._inline_index import ResultIndex, get_result_index, render_result, tokenize
+import json
+import pytest
+
+ITEMS = [
+    {"title": "Weather today", "message_text": "Sunny"},
+    {"title": "Weekly report", "description": "Sales figures"},
+    {"title": "Sales call", "keywords": ["phone", "meeting"]},
+    {"type": "photo", "photo_url": "https://example.com/a.jpg", "thumb_url": "https://example.com/t.jpg",
+     "caption": "Weekend trip"},
+]
+
+
+def test_tokenize_casefolds_words():
+    assert tokenize("Héllo, WORLD! 42") == ["héllo", "world", "42"]
+
+
+def test_search_matches_every_word_as_a_prefix():
+    index = ResultIndex(ITEMS)
+    assert index.search("we") == [0, 1, 3]
+    assert index.search("WEEK") == [1, 3]
+    assert index.search("week sal") == [1]
+    assert index.search("phone") == [2]
+    assert index.search("weekly phone") == []
+    # An empty query matches everything, in corpus order
+    assert index.search("") == [0, 1, 2, 3]
+
+
+def test_page_offsets_and_cache():
+    index = ResultIndex([{"title": f"Item {n}"} for n in range(5)])
+    results, next_offset, total, cached = index.page("item", page_size=2)
+    assert [result.id for result in results] == ["0", "1"]
+    assert (next_offset, total, cached) == ("2", 5, False)
+
+    results, next_offset, _, _ = index.page("item", "4", page_size=2)
+    assert [result.id for result in results] == ["4"]
+    assert next_offset == ""
+
+    # Same words in another case or order hit the rendered page cache
+    assert index.page("ITEM", page_size=2)[3]
+    # Garbage offsets start from the first page
+    assert index.page("item", "abc", page_size=2)[1] == "2"
+
+
+def test_render_article_shorthand():
+    result = render_result({"title": "Hi", "message_text": "Hello", "keywords": ["x"]}, 3)
+    assert isinstance(result, InlineQueryResultArticle)
+    assert result.id == "3"
+    assert result.input_message_content.message_text == "Hello"
+
+
+def test_render_photo_and_cached_photo():
+    photo = render_result(ITEMS[3], 0)
+    assert isinstance(photo, InlineQueryResultPhoto)
+    assert photo.thumbnail_url == "https://example.com/t.jpg"
+
+    cached = render_result({"type": "photo", "id": 7, "photo_file_id": "AgAD"}, 0)
+    assert isinstance(cached, InlineQueryResultCachedPhoto)
+    assert cached.id == "7"
+
+
+def test_invalid_results_are_rejected():
+    with pytest.raises(ValueError):
+        ResultIndex(["not an object"])
+    with pytest.raises(ValueError):
+        ResultIndex([{"type": "hologram"}])
+    with pytest.raises(ValueError):
+        render_result({"type": "sticker"}, 0)
+
+
+def test_get_result_index_reuses_the_same_corpus():
+    inline_index_cache.clear()
+    index, cached = get_result_index(json.dumps(ITEMS))
+    assert not cached and len(index) == 4
+    assert get_result_index(json.dumps(ITEMS)) == (index, True)
+
+    listed, cached = get_result_index(ITEMS)
+    assert not cached and listed is not index
+    with pytest.raises(ValueError):
+        get_result_index('{"title": "not a list"}')
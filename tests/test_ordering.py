@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+from tools._bot_pool import PooledBot
+from tools._cache import chat_cache
+from tools._ordering import ChatSequencer
+import asyncio
+import pytest
+
+
+async def send(sequencer, chat_id, delay, log, name):
+    async with sequencer.hold(chat_id):
+        log.append(f"{name} start")
+        await asyncio.sleep(delay)
+        log.append(f"{name} end")
+
+
+def test_same_chat_runs_in_call_order():
+    async def main():
+        sequencer = ChatSequencer()
+        log = []
+        # The first send is the slowest, yet the others still wait for it
+        await asyncio.gather(
+            send(sequencer, 1, 0.03, log, "a"),
+            send(sequencer, "1", 0.01, log, "b"),
+            send(sequencer, 1, 0, log, "c"),
+        )
+        assert log == ["a start", "a end", "b start", "b end", "c start", "c end"]
+        assert len(sequencer) == 0
+
+    asyncio.run(main())
+
+
+def test_different_chats_run_in_parallel():
+    async def main():
+        sequencer = ChatSequencer()
+        log = []
+        await asyncio.gather(send(sequencer, 1, 0.02, log, "a"), send(sequencer, 2, 0, log, "b"))
+        assert log == ["a start", "b start", "b end", "a end"]
+
+    asyncio.run(main())
+
+
+def test_no_chat_is_not_ordered():
+    async def main():
+        sequencer = ChatSequencer()
+        async with sequencer.hold(None):
+            assert sequencer.waiting() == 0
+
+    asyncio.run(main())
+
+
+def test_turn_is_released_on_error_and_cancellation():
+    async def main():
+        sequencer = ChatSequencer()
+        with pytest.raises(RuntimeError):
+            async with sequencer.hold(1):
+                raise RuntimeError("send failed")
+
+        async with sequencer.hold(1):
+            waiter = asyncio.create_task(send(sequencer, 1, 0, [], "b"))
+            await asyncio.sleep(0)
+            assert sequencer.waiting() == 2
+            waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert sequencer.waiting() == 0 and len(sequencer) == 0
+
+    asyncio.run(main())
+
+
+def test_bot_keys_turns_on_the_chat_posted_to():
+    async def main():
+        bot = PooledBot(token="123:test")
+        bot.remember_migration(-1, -1001)
+        chat_cache.set((bot.key, "@channel"), SimpleNamespace(id=-1002))
+        try:
+            async with bot.hold_chat(-1):
+                async with bot.hold_chat("@Channel"):
+                    assert set(bot.sequencer._queues) == {"-1001", "-1002"}
+        finally:
+            chat_cache.clear()
+            await bot.shutdown()
+
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+from tools._proxy_upload import _multipart_parts, _source_filename, parse_source_headers
+import httpx
+import pytest
+
+
+def source_filename(url: str, disposition: str = None) -> str:
+    headers = {"Content-Disposition": disposition} if disposition else {}
+    return _source_filename(httpx.Response(200, headers=headers), url)
+
+
+def test_crlf_in_url_path_cannot_inject_headers():
+    filename = source_filename("https://example.com/files/a.pdf%0d%0aContent-Type:%20text")
+    assert filename == "a.pdfContent-Type: text"
+
+    # A filename given directly is sanitized as well
+    head, _ = _multipart_parts({"chat_id": 1}, "document", "a.pdf\r\nX-Evil: 1", "application/pdf", "b")
+    assert b"\r\nX-Evil" not in head
+    assert b'filename="a.pdfX-Evil: 1"\r\nContent-Type: application/pdf\r\n' in head
+
+
+def test_quoted_content_disposition_filename():
+    assert source_filename("https://example.com/download", 'attachment; filename="report.pdf"') == "report.pdf"
+    # Embedded quotes and backslashes would end the filename parameter early
+    filename = source_filename("https://example.com/download", 'attachment; filename="a\\"b.pdf"')
+    assert '"' not in filename and "\\" not in filename
+    head, _ = _multipart_parts({}, "document", filename, "application/pdf", "b")
+    assert head.count(b'"') == 4
+
+
+def test_filename_falls_back_to_url_and_placeholder():
+    assert source_filename("https://example.com/a%20b.mp4?x=1") == "a b.mp4"
+    assert source_filename("https://example.com/") == "file"
+
+
+def test_multipart_parts_encode_fields():
+    head, tail = _multipart_parts(
+        {"chat_id": 5, "caption": "hi", "reply_markup": {"inline_keyboard": []}, "skip": None},
+        "video", "clip.mp4", "video/mp4", "BOUNDARY"
+    )
+    assert b'name="chat_id"\r\n\r\n5\r\n' in head
+    assert b'name="reply_markup"\r\n\r\n{"inline_keyboard": []}\r\n' in head
+    assert b"skip" not in head
+    assert head.endswith(b'name="video"; filename="clip.mp4"\r\nContent-Type: video/mp4\r\n\r\n')
+    assert tail == b"\r\n--BOUNDARY--\r\n"
+
+
+def test_parse_source_headers():
+    assert parse_source_headers(None) is None
+    assert parse_source_headers("{}") is None
+    assert parse_source_headers('{"Authorization": "Bearer x"}') == {"Authorization": "Bearer x"}
+    assert parse_source_headers({"Cookie": "a=b"}) == {"Cookie": "a=b"}
+
+
+@pytest.mark.parametrize("value", [
+    '{"X-Retry": 3}', '{"X-List": ["a"]}', '{"X-Null": null}', '["Authorization"]', '"text"', {"X": 1}
+])
+def test_parse_source_headers_rejects_non_string_values(value):
+    with pytest.raises(ValueError):
+        parse_source_headers(value)
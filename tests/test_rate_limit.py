@@ -0,0 +1,120 @@
+from telegram.error import RetryAfter
+from tools import _rate_limit
+from tools._rate_limit import RateLimiter, TokenBucket, is_private_chat, message_count
+from tools._retry import request_deadline
+import asyncio
+import pytest
+import time
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(_rate_limit, "time", clock)
+    return clock
+
+
+def test_bucket_reserves_into_debt(clock):
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # Third token is half a second away at 2 tokens per second
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve(3) == pytest.approx(2.0)
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate=1.0, capacity=3)
+    assert bucket.try_take(3)
+    assert not bucket.try_take()
+    assert bucket.wait_time() == pytest.approx(1.0)
+    clock.now += 100
+    assert bucket.is_idle()
+    assert bucket.try_take(3)
+    assert not bucket.try_take()
+
+
+def test_bucket_refund(clock):
+    bucket = TokenBucket(rate=1.0, capacity=1)
+    bucket.reserve(5)
+    bucket.refund(5)
+    assert bucket.is_idle()
+    bucket.refund(5)
+    assert bucket.try_take() and not bucket.try_take()
+
+
+def test_is_private_chat():
+    assert is_private_chat(12345)
+    assert is_private_chat("12345")
+    assert not is_private_chat(-1001234567890)
+    assert not is_private_chat("@channel")
+    assert not is_private_chat(None)
+
+
+def test_message_count():
+    assert message_count("sendMessage", {"chat_id": 1}) == 1
+    assert message_count("sendMediaGroup", {"media": [object()] * 10}) == 10
+    assert message_count("forwardMessages", {"message_ids": list(range(100))}) == 100
+    assert message_count("copyMessages", {"message_ids": []}) == 1
+    assert message_count("copyMessages", {}) == 1
+
+
+def test_unlimited_endpoints_pass_through():
+    limiter = RateLimiter()
+
+    async def run():
+        return await limiter.acquire("getChat", -100)
+
+    assert asyncio.run(run()) == 0.0
+    assert limiter.stats()["total_calls"] == 0
+
+
+def test_multi_message_call_takes_one_token_per_message():
+    limiter = RateLimiter()
+
+    async def run():
+        await limiter.acquire("sendMediaGroup", -100, 10)
+        await limiter.acquire("sendMediaGroup", -100, 10)
+
+    asyncio.run(run())
+    # A group's burst of 20 is now used up
+    assert limiter._chat_bucket(-100).wait_time() > 2.0
+    assert limiter.stats()["total_calls"] == 2
+
+
+def test_chat_wait_past_deadline_raises_retry_after():
+    limiter = RateLimiter()
+
+    async def run():
+        request_deadline.set(time.monotonic() + 2)
+        # 21 messages to a group: the last is 3 seconds away at 20 per minute
+        await limiter.acquire("forwardMessages", -100, 21)
+
+    with pytest.raises(RetryAfter):
+        asyncio.run(run())
+    # The refused reservation is returned to the chat
+    assert limiter._chat_bucket(-100).is_idle()
+    assert limiter.stats()["queue_depth"] == 0
+
+
+def test_private_chat_is_paced_to_one_per_second():
+    limiter = RateLimiter()
+
+    async def run():
+        started = time.monotonic()
+        await limiter.acquire("sendMessage", 42)
+        waited = await limiter.acquire("sendMessage", 42)
+        return time.monotonic() - started, waited
+
+    elapsed, waited = asyncio.run(run())
+    assert elapsed >= 0.9
+    assert waited >= 0.9
+    assert limiter.stats()["delayed_calls"] == 1
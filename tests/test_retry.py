@@ -0,0 +1,97 @@
+from telegram.error import BadRequest, ChatMigrated, NetworkError, RetryAfter, TimedOut
+from tools import _retry
+from tools._retry import MAX_FLOOD_RETRIES, MAX_NETWORK_RETRIES, request_deadline, with_retry
+import asyncio
+import pytest
+import time
+
+# Reading RetryAfter.retry_after warns about its coming switch to timedelta, which with_retry handles
+pytestmark = pytest.mark.filterwarnings("ignore::telegram.warnings.PTBDeprecationWarning")
+
+
+@pytest.fixture(autouse=True)
+def no_waits(monkeypatch):
+    monkeypatch.setattr(_retry, "RETRY_AFTER_PADDING", 0.0)
+    monkeypatch.setattr(_retry, "BACKOFF_BASE", 0.001)
+
+
+class Failing:
+    """Raises the given errors in turn, then returns "ok" """
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def run(call, deadline_in=None, **kwargs):
+    async def main():
+        if deadline_in is not None:
+            request_deadline.set(time.monotonic() + deadline_in)
+        return await with_retry(call, **kwargs)
+
+    return asyncio.run(main())
+
+
+def test_flood_wait_is_retried():
+    call = Failing(RetryAfter(0), RetryAfter(0))
+    assert run(call) == "ok"
+    assert call.calls == 3
+
+
+def test_flood_wait_past_the_deadline_is_raised():
+    call = Failing(RetryAfter(0), RetryAfter(5))
+    with pytest.raises(RetryAfter):
+        run(call, deadline_in=3)
+    # The first wait fit the budget, the second didn't
+    assert call.calls == 2
+
+
+def test_flood_retries_are_capped():
+    call = Failing(*(RetryAfter(0) for _ in range(MAX_FLOOD_RETRIES + 1)))
+    with pytest.raises(RetryAfter):
+        run(call)
+    assert call.calls == MAX_FLOOD_RETRIES + 1
+
+
+def test_network_retries_are_capped():
+    call = Failing(TimedOut(), *(NetworkError("reset") for _ in range(MAX_NETWORK_RETRIES)))
+    with pytest.raises(NetworkError):
+        run(call)
+    assert call.calls == MAX_NETWORK_RETRIES + 1
+
+    call = Failing(*(NetworkError("reset") for _ in range(MAX_NETWORK_RETRIES)))
+    assert run(call) == "ok"
+
+
+def test_bad_request_is_not_retried():
+    assert issubclass(BadRequest, NetworkError)
+    call = Failing(BadRequest("message text is empty"))
+    with pytest.raises(BadRequest):
+        run(call)
+    assert call.calls == 1
+
+
+def test_chat_migration_is_followed_once():
+    migrations = []
+    call = Failing(ChatMigrated(-1001))
+    assert run(call, on_migrate=migrations.append) == "ok"
+    assert migrations == [-1001]
+
+    migrations = []
+    call = Failing(ChatMigrated(-1001), ChatMigrated(-1002))
+    with pytest.raises(ChatMigrated):
+        run(call, on_migrate=migrations.append)
+    assert migrations == [-1001]
+
+
+def test_chat_migration_without_handler_is_raised():
+    call = Failing(ChatMigrated(-1001))
+    with pytest.raises(ChatMigrated):
+        run(call)
+    assert call.calls == 1
@@ -0,0 +1,99 @@
+from tools._rate_limit import TokenBucket
+from tools._scheduler import BULK, INTERACTIVE, NORMAL, FairScheduler, send_priority, with_priority
+import asyncio
+import pytest
+
+
+class EmptyBucket:
+    """Never has a token to spare, but serves the queue without delay, so the order is deterministic"""
+
+    def __init__(self):
+        self.taken = 0
+
+    def try_take(self, tokens: int = 1) -> bool:
+        return False
+
+    def wait_time(self) -> float:
+        return 0.0
+
+    def reserve(self, tokens: int = 1) -> float:
+        self.taken += tokens
+        return 0.0
+
+    def refund(self, tokens: int = 1) -> None:
+        self.taken -= tokens
+
+
+def run_sends(sends, cancel=()):
+    """
+    Queue (priority, chat_id, tokens) sends, in order, and return the indexes
+    of the sends in the order they were served
+    """
+    async def main():
+        bucket = EmptyBucket()
+        scheduler = FairScheduler(bucket)
+        served = []
+
+        async def send(index, priority, chat_id, tokens):
+            await scheduler.acquire(priority, chat_id, tokens)
+            served.append(index)
+
+        tasks = [asyncio.create_task(send(index, *args)) for index, args in enumerate(sends)]
+        # Let every send queue up before any is served
+        await asyncio.sleep(0)
+        for index in cancel:
+            tasks[index].cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert len(scheduler) == 0
+        # Cancelled sends don't use up tokens
+        assert bucket.taken == sum(sends[index][2] for index in served)
+        return served
+
+    return asyncio.run(main())
+
+
+def test_uncontended_send_goes_straight_through():
+    async def main():
+        scheduler = FairScheduler(TokenBucket(rate=1, capacity=1))
+        await asyncio.wait_for(scheduler.acquire(NORMAL, 1), 0.1)
+        assert scheduler._dispatcher is None
+
+    asyncio.run(main())
+
+
+def test_interactive_send_overtakes_bulk_backlog():
+    served = run_sends([(BULK, 1, 1), (BULK, 2, 1), (BULK, 3, 1), (INTERACTIVE, 4, 1)])
+    assert served[0] == 3
+
+
+def test_bulk_still_gets_its_share():
+    # Interactive weighs 16 times bulk: the bulk send ties with the 16th interactive one
+    served = run_sends([(BULK, 1, 1)] + [(INTERACTIVE, chat_id, 1) for chat_id in range(2, 40)])
+    assert served.index(0) == 15
+
+
+def test_chats_in_a_class_take_turns():
+    served = run_sends([(NORMAL, 1, 1), (NORMAL, 1, 1), (NORMAL, 1, 1), (NORMAL, 2, 1)])
+    assert served == [0, 3, 1, 2]
+
+
+def test_multi_message_send_costs_its_tokens():
+    # An album of five is served after five single messages to another chat
+    served = run_sends([(NORMAL, 1, 5), (NORMAL, 2, 1), (NORMAL, 2, 1), (NORMAL, 2, 1)])
+    assert served == [1, 2, 3, 0]
+
+
+def test_cancelled_waiter_is_skipped():
+    served = run_sends([(NORMAL, 1, 1), (NORMAL, 2, 1), (NORMAL, 3, 1)], cancel=(1,))
+    assert served == [0, 2]
+
+
+def test_with_priority_sets_the_class():
+    async def current():
+        return send_priority.get()
+
+    assert asyncio.run(with_priority(current(), BULK)) == BULK
+    coro = current()
+    with pytest.raises(ValueError):
+        asyncio.run(with_priority(coro, "urgent"))
+    coro.close()
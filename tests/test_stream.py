@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+from tools import _stream
+from tools._stream import PLACEHOLDER_TEXT, MessageStream, update_stream
+import asyncio
+import pytest
+
+TELEGRAM_LIMIT = 4096
+
+
+class FakeBot:
+    key = "bot"
+
+    def __init__(self, send_delay: float = 0.0):
+        self.send_delay = send_delay
+        self.sent = []
+        self.edits = []
+        self.sending = asyncio.Event()
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append(text)
+        message_id = len(self.sent)
+        self.sending.set()
+        await asyncio.sleep(self.send_delay)
+        return SimpleNamespace(message_id=message_id)
+
+    async def edit_message_text(self, chat_id, message_id, text, **kwargs):
+        self.edits.append((message_id, text))
+
+    def text_of(self, message_id: int) -> str:
+        return next((text for edited, text in reversed(self.edits) if edited == message_id),
+                    self.sent[message_id - 1])
+
+
+@pytest.fixture(autouse=True)
+def no_streams():
+    _stream._streams.clear()
+    yield
+    _stream._streams.clear()
+
+
+def test_concurrent_first_calls_share_one_placeholder():
+    async def main():
+        bot = FakeBot(send_delay=0.02)
+        results = await asyncio.gather(*(
+            update_stream(bot, "s", 1, f"part {n} ") for n in range(3)
+        ))
+        assert bot.sent == [PLACEHOLDER_TEXT]
+        assert len({id(stream) for stream, _ in results}) == 1
+        assert [created for _, created in results] == [True, False, False]
+
+        stream, _ = await update_stream(bot, "s", 1, final=True)
+        assert bot.text_of(1) == "part 0 part 1 part 2 "
+        assert stream.message_ids == [1]
+
+    asyncio.run(main())
+
+
+def test_failed_start_is_reported_to_joined_calls():
+    class FailingBot(FakeBot):
+        async def send_message(self, chat_id, text, **kwargs):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("chat not found")
+
+    async def main():
+        results = await asyncio.gather(
+            *(update_stream(FailingBot(), "s", 1, "hi") for _ in range(2)), return_exceptions=True
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert not _stream._streams
+
+    asyncio.run(main())
+
+
+def test_rollover_past_the_message_limit():
+    async def main():
+        bot = FakeBot()
+        text = "word " * 1000
+        stream, _ = await update_stream(bot, "s", 1, text, final=True)
+        assert len(stream.message_ids) == 2
+        parts = [bot.text_of(message_id) for message_id in stream.message_ids]
+        assert all(len(part) <= TELEGRAM_LIMIT for part in parts)
+        assert " ".join(part.strip() for part in parts) == text.strip()
+
+    asyncio.run(main())
+
+
+def test_close_waits_for_a_flush_already_sending():
+    async def main():
+        bot = FakeBot()
+        stream = MessageStream(bot, 1, interval=0)
+        await stream.start()
+        bot.send_delay = 0.05
+        stream.update("word " * 1000)
+        # Let the scheduled flush get as far as posting the rollover message
+        bot.sending.clear()
+        await bot.sending.wait()
+        await stream.close()
+        # Placeholder and one rollover; the final flush doesn't post it again
+        assert len(bot.sent) == 2
+        assert stream.message_ids == [1, 2]
+
+    asyncio.run(main())
+
+
+def test_replace_must_keep_the_committed_prefix():
+    async def main():
+        bot = FakeBot()
+        stream = MessageStream(bot, 1, interval=0)
+        await stream.start()
+        first = "word " * 1000
+        stream.update(first)
+        await stream.flush()
+        assert len(stream.message_ids) == 2
+        committed = stream.text[:stream._committed]
+        assert committed
+
+        with pytest.raises(ValueError):
+            stream.update("something else", replace=True)
+        stream.update(committed + "rewritten tail", replace=True)
+        await stream.close()
+        assert bot.text_of(1).strip() == committed.strip()
+        assert bot.text_of(2) == "rewritten tail"
+
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+from tools._text_split import split_text, split_text_with_offsets, utf16_length
+import pytest
+
+
+def test_short_text_is_one_part():
+    assert split_text("hello world") == ["hello world"]
+
+
+def test_parts_fit_the_limit_and_keep_every_word():
+    text = " ".join(f"word{index}" for index in range(2000))
+    parts = split_text(text, limit=100)
+    assert all(utf16_length(part) <= 100 for part in parts)
+    assert " ".join(parts).split() == text.split()
+
+
+def test_prefers_paragraph_breaks():
+    first = "a" * 60
+    second = "b " * 40
+    parts = split_text(f"{first}\n\n{second}", limit=100)
+    assert parts[0] == first
+
+
+def test_prefers_sentence_over_word_breaks():
+    text = "A longer first sentence is here. " + "word " * 30
+    parts = split_text(text, limit=50)
+    assert parts[0] == "A longer first sentence is here."
+
+
+def test_limit_counts_utf16_code_units():
+    # Each emoji is two UTF-16 code units
+    text = "😀" * 30
+    parts = split_text(text, limit=20)
+    assert all(utf16_length(part) <= 20 for part in parts)
+    assert "".join(parts) == text
+    assert len(parts) == 3
+
+
+def test_html_tags_are_closed_and_reopened():
+    text = "<b>" + "bold words " * 20 + "</b>"
+    parts = split_text(text, parse_mode="HTML", limit=80)
+    assert len(parts) > 1
+    for part in parts:
+        assert part.startswith("<b>") and part.endswith("</b>")
+        assert utf16_length(part) <= 80
+
+
+def test_html_entities_are_never_split():
+    text = "&amp;" * 50
+    parts = split_text(text, parse_mode="HTML", limit=12)
+    assert all(part.replace("&amp;", "") == "" for part in parts)
+
+
+def test_markdown_v2_code_block_keeps_its_language():
+    text = "```python\n" + "print(1)\n" * 30 + "```"
+    parts = split_text(text, parse_mode="MarkdownV2", limit=100)
+    assert len(parts) > 1
+    for part in parts:
+        assert part.startswith("```python\n") and part.endswith("```")
+
+
+def test_markdown_v2_escapes_stay_whole():
+    text = "\\*" * 60
+    parts = split_text(text, parse_mode="MarkdownV2", limit=25)
+    assert all(not part.endswith("\\") or part.endswith("\\\\") for part in parts)
+    assert "".join(parts) == text
+
+
+def test_offsets_point_at_the_next_part():
+    text = "<i>" + "x " * 60 + "</i>"
+    parts = split_text_with_offsets(text, parse_mode="HTML", limit=50)
+    part, end, reopen = parts[0]
+    assert reopen == "<i>"
+    assert text[end:].startswith("x")
+    assert parts[-1][1] == len(text)
+
+
+def test_unbreakable_piece_longer_than_limit_raises():
+    text = "[" + "a" * 50 + "](https://example.com)"
+    with pytest.raises(ValueError):
+        split_text(text + " tail " * 10, parse_mode="MarkdownV2", limit=40)
@@ -0,0 +1,118 @@
+from telegram.error import NetworkError
+from tools import _updates
+from tools._updates import RecentUpdateIds, UpdateOffsetStore, compact_update, poll_updates
+import asyncio
+import json
+import pytest
+
+
+class FakeBot:
+    key = "bot"
+
+    def __init__(self, batches, fail_after=None):
+        self.batches = list(batches)
+        self.fail_after = fail_after
+        self.offsets = []
+
+    async def get_raw_updates(self, offset, limit, timeout, allowed_updates):
+        self.offsets.append(offset)
+        if self.fail_after is not None and len(self.offsets) > self.fail_after:
+            raise NetworkError("connection reset")
+        return self.batches.pop(0) if self.batches else []
+
+
+@pytest.fixture
+def offsets(monkeypatch):
+    store = UpdateOffsetStore()
+    monkeypatch.setattr(_updates, "update_offsets", store)
+    return store
+
+
+def test_offset_store_persists_and_reloads(tmp_path):
+    path = tmp_path / "offsets.json"
+    store = UpdateOffsetStore(str(path))
+    assert store.get("bot") is None
+    store.set("bot", 42)
+    assert json.loads(path.read_text()) == {"bot": 42}
+    assert UpdateOffsetStore(str(path)).get("bot") == 42
+
+
+def test_offset_store_in_memory_and_unreadable_file(tmp_path):
+    store = UpdateOffsetStore()
+    store.set("bot", 7)
+    assert store.get("bot") == 7
+
+    path = tmp_path / "offsets.json"
+    path.write_text("not json")
+    assert UpdateOffsetStore(str(path)).get("bot") is None
+
+
+def test_recent_update_ids_drop_redeliveries():
+    recent = RecentUpdateIds(max_entries=3)
+    assert recent.add(1)
+    assert not recent.add(1)
+    assert recent.add(2)
+    assert len(recent) == 2
+
+
+def test_recent_update_ids_forget_the_oldest():
+    recent = RecentUpdateIds(max_entries=3)
+    for update_id in (1, 2, 3, 4):
+        assert recent.add(update_id)
+    assert len(recent) == 3
+    assert recent.add(1)
+    assert not recent.add(4)
+
+
+def test_compact_message_update():
+    update = {
+        "update_id": 10,
+        "message": {
+            "message_id": 5, "date": 1700000000, "caption": "look",
+            "chat": {"id": -100, "type": "supergroup"},
+            "from": {"id": 1, "username": "alice"},
+            "photo": [{"file_id": "x"}],
+        },
+    }
+    assert compact_update(update) == {
+        "update_id": 10, "type": "message", "chat_id": -100, "chat_type": "supergroup",
+        "user_id": 1, "username": "alice", "message_id": 5, "date": 1700000000,
+        "text": "look", "media": "photo",
+    }
+
+
+def test_compact_callback_query_update():
+    update = {
+        "update_id": 11,
+        "callback_query": {
+            "id": "cb1", "data": "yes", "from": {"id": 2},
+            "message": {"message_id": 6, "chat": {"id": 3, "type": "private"}},
+        },
+    }
+    assert compact_update(update) == {
+        "update_id": 11, "type": "callback_query", "id": "cb1", "chat_id": 3,
+        "chat_type": "private", "user_id": 2, "message_id": 6, "data": "yes",
+    }
+
+
+def test_poll_leaves_saving_the_offset_to_the_caller(offsets):
+    offsets.set("bot", 1)
+    bot = FakeBot([[{"update_id": 1}, {"update_id": 2}], [{"update_id": 3}]])
+    updates, next_offset, batches, drained = asyncio.run(poll_updates(bot, limit=2, max_batches=5))
+    assert [update["update_id"] for update in updates] == [1, 2, 3]
+    assert (next_offset, batches, drained) == (4, 2, True)
+    assert bot.offsets == [1, 3]
+    assert offsets.get("bot") == 1
+
+
+def test_poll_returns_fetched_batches_when_a_later_one_fails(offsets):
+    bot = FakeBot([[{"update_id": 1}, {"update_id": 2}]], fail_after=1)
+    updates, next_offset, batches, drained = asyncio.run(poll_updates(bot, limit=2, max_batches=5))
+    assert [update["update_id"] for update in updates] == [1, 2]
+    assert (next_offset, batches, drained) == (3, 1, False)
+
+
+def test_poll_raises_when_the_first_batch_fails(offsets):
+    bot = FakeBot([], fail_after=0)
+    with pytest.raises(NetworkError):
+        asyncio.run(poll_updates(bot))
@@ -0,0 +1,53 @@
+from tools import _upload_cache
+from tools._upload_cache import FileIdCache, hash_file
+import hashlib
+import json
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = FileIdCache(max_entries=2)
+    cache.put("a", "file-a")
+    cache.put("b", "file-b")
+    assert cache.get("a") == "file-a"
+    cache.put("c", "file-c")
+    assert cache.get("b") is None
+    assert cache.get("a") == "file-a"
+    assert cache.get("c") == "file-c"
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_discard():
+    cache = FileIdCache()
+    cache.put("a", "file-a")
+    cache.discard("a")
+    cache.discard("missing")
+    assert cache.get("a") is None
+
+
+def test_persists_and_reloads(tmp_path, monkeypatch):
+    path = tmp_path / "file-ids.json"
+    monkeypatch.setattr(_upload_cache, "SAVE_INTERVAL", 0)
+    cache = FileIdCache(max_entries=2, path=str(path))
+    cache.put("a", "file-a")
+    cache.put("b", "file-b")
+    assert json.loads(path.read_text()) == {"a": "file-a", "b": "file-b"}
+
+    reloaded = FileIdCache(max_entries=1, path=str(path))
+    # Only the most recently used entries that fit are loaded
+    assert reloaded.get("a") is None
+    assert reloaded.get("b") == "file-b"
+
+
+def test_unreadable_cache_file_is_ignored(tmp_path):
+    path = tmp_path / "file-ids.json"
+    path.write_text("not json")
+    assert len(FileIdCache(path=str(path))) == 0
+
+
+def test_hash_file(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"x" * 3000)
+    assert hash_file(str(path)) == hashlib.sha256(b"x" * 3000).hexdigest()
+    path.write_bytes(b"y" * 3001)
+    assert hash_file(str(path)) == hashlib.sha256(b"y" * 3001).hexdigest()
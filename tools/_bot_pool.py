@@ -0,0 +1,375 @@
+"""
+Process-wide registry of initialized Telegram Bot instances
+"""
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import asynccontextmanager
+from telegram import Bot
+from telegram.error import InvalidToken
+from telegram.request import HTTPXRequest, RequestData
+from telegram.request._requestparameter import RequestParameter
+from tools._cache import chat_cache
+from tools._ordering import ChatSequencer
+from tools._rate_limit import RATE_LIMITED_ENDPOINTS, RateLimiter, message_count
+from tools._retry import with_retry
+from dataclasses import dataclass, field
+from typing import Any, AsyncContextManager, AsyncIterator, Dict, List, Optional
+import asyncio
+import atexit
+import hashlib
+import httpx
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bots unused for this long are shut down and dropped from the pool
+BOT_IDLE_TIMEOUT = 600
+# How often acquire() sweeps the pool for idle bots
+EVICTION_INTERVAL = 60
+# Keep-alive connections per bot (python-telegram-bot defaults to 1)
+CONNECTION_POOL_SIZE = 32
+POOL_TIMEOUT = 10.0
+# Upper bound for initialize()/shutdown() when driven from another thread
+LIFECYCLE_TIMEOUT = 30.0
+# Read size when streaming files from Telegram's file server
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Keep-alive connections per bot for file downloads and streamed uploads
+FILE_POOL_SIZE = 8
+FILE_READ_TIMEOUT = 60.0
+# Connections per bot to the remote hosts proxy uploads read from. Separate from the
+# file pool, so uploads holding a source connection never wait for one to Telegram
+SOURCE_POOL_SIZE = 8
+
+# Calls a user is watching a spinner for. They go over their own small connection
+# pool, so they never wait for a free connection behind bulk sends. getMe, sent by
+# initialize(), opens the lane's first connection
+PRIORITY_ENDPOINTS = frozenset({"answerCallbackQuery", "answerInlineQuery", "getMe"})
+PRIORITY_POOL_SIZE = 4
+# httpx closes idle connections after 5 seconds; keep the lane's open much longer
+PRIORITY_KEEPALIVE = 120.0
+
+
+def token_key(token: str) -> str:
+    """Hash a bot token so the raw secret is never used as a dict key or logged"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class PooledBot(Bot):
+    """
+    Bot that sends every API call through its rate limiter and the retry engine,
+    except PRIORITY_ENDPOINTS, which skip the limiter and use priority_request.
+    Calls that post into a chat are delivered in order per chat. Streamed
+    transfers go over http_client, which the bot owns alongside its requests
+    """
+
+    __slots__ = (
+        "_key", "_rate_limiter", "_migrated_chats", "_priority_request", "_sequencer", "_http_client",
+        "_active", "_last_active", "_source_client"
+    )
+
+    def __init__(self, *args, priority_request: Optional[HTTPXRequest] = None,
+                 http_client: Optional[httpx.AsyncClient] = None,
+                 source_client: Optional[httpx.AsyncClient] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._key = token_key(self.token)
+        self._rate_limiter = RateLimiter()
+        # Group chat id -> supergroup chat id learned from ChatMigrated errors
+        self._migrated_chats: Dict[str, int] = {}
+        self._priority_request = priority_request
+        self._sequencer = ChatSequencer()
+        self._http_client = http_client or httpx.AsyncClient(
+            timeout=httpx.Timeout(FILE_READ_TIMEOUT, connect=POOL_TIMEOUT),
+            limits=httpx.Limits(max_connections=FILE_POOL_SIZE)
+        )
+        self._source_client = source_client or httpx.AsyncClient(
+            timeout=httpx.Timeout(FILE_READ_TIMEOUT, connect=POOL_TIMEOUT),
+            limits=httpx.Limits(max_connections=SOURCE_POOL_SIZE),
+            follow_redirects=True
+        )
+        # Calls in flight and when the last one ended, so the pool never evicts a bot mid-job
+        self._active = 0
+        self._last_active = time.monotonic()
+
+    @property
+    def key(self) -> str:
+        """Hash of the bot token, for keying per-bot caches"""
+        return self._key
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self._rate_limiter
+
+    @property
+    def sequencer(self) -> ChatSequencer:
+        return self._sequencer
+
+    def resolve_chat_id(self, chat_id: Any) -> Any:
+        """The chat to post to: a migrated group's supergroup id, else chat_id itself"""
+        if chat_id is not None and str(chat_id) in self._migrated_chats:
+            return self._migrated_chats[str(chat_id)]
+        return chat_id
+
+    def remember_migration(self, chat_id: Any, new_chat_id: int) -> None:
+        self._migrated_chats[str(chat_id)] = new_chat_id
+
+    def hold_chat(self, chat_id: Any) -> AsyncContextManager[None]:
+        """
+        The sequencer turn for chat_id, keyed on the chat actually posted to:
+        a migrated group shares its supergroup's turn, and an @username shares
+        the numeric id's once the chat is cached
+        """
+        chat_id = self.resolve_chat_id(chat_id)
+        if isinstance(chat_id, str) and chat_id.startswith("@"):
+            chat = chat_cache.get((self._key, chat_id.lower()))
+            if chat is not None:
+                chat_id = chat.id
+        return self._sequencer.hold(chat_id)
+
+    @property
+    def busy(self) -> bool:
+        return self._active > 0
+
+    @property
+    def last_active(self) -> float:
+        """Monotonic time the last call through this bot ended"""
+        return self._last_active
+
+    @asynccontextmanager
+    async def in_use(self) -> AsyncIterator[None]:
+        """Mark a call in flight for the duration of the block"""
+        self._active += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._last_active = time.monotonic()
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Client for streamed downloads and uploads, which HTTPXRequest doesn't offer"""
+        return self._http_client
+
+    @property
+    def source_client(self) -> httpx.AsyncClient:
+        """Client for reading proxy upload sources from arbitrary hosts; follows redirects"""
+        return self._source_client
+
+    async def initialize(self) -> None:
+        if self._priority_request is not None:
+            await self._priority_request.initialize()
+        await super().initialize()
+
+    async def shutdown(self) -> None:
+        await super().shutdown()
+        # Bot.shutdown() skips its requests when initialize() failed part way;
+        # HTTPXRequest.shutdown() is a no-op for a closed client
+        requests = [*self._request]
+        if self._priority_request is not None:
+            requests.append(self._priority_request)
+        await asyncio.gather(*(request.shutdown() for request in requests))
+        await self._http_client.aclose()
+        await self._source_client.aclose()
+
+    async def _do_post(self, endpoint: str, data: Dict[str, Any], **kwargs) -> Any:
+        async with self.in_use():
+            return await self._send(endpoint, data, **kwargs)
+
+    async def _send(self, endpoint: str, data: Dict[str, Any], **kwargs) -> Any:
+        if endpoint in PRIORITY_ENDPOINTS and self._priority_request is not None:
+            return await with_retry(
+                lambda: self._post_priority(endpoint, data, **kwargs), description=endpoint
+            )
+
+        if data.get("chat_id") is not None:
+            data["chat_id"] = self.resolve_chat_id(data["chat_id"])
+
+        async def attempt():
+            await self._rate_limiter.acquire(endpoint, data.get("chat_id"), message_count(endpoint, data))
+            return await super(PooledBot, self)._do_post(endpoint, data, **kwargs)
+
+        def migrate(new_chat_id: int):
+            self.remember_migration(data["chat_id"], new_chat_id)
+            data["chat_id"] = new_chat_id
+
+        # Messages to one chat go out in the order they were sent, retries included
+        ordered_chat_id = data.get("chat_id") if endpoint in RATE_LIMITED_ENDPOINTS else None
+        async with self.hold_chat(ordered_chat_id):
+            return await with_retry(
+                attempt,
+                on_migrate=migrate if "chat_id" in data else None,
+                description=endpoint
+            )
+
+    async def _post_priority(self, endpoint: str, data: Dict[str, Any], **kwargs) -> Any:
+        request_data = RequestData(
+            parameters=[RequestParameter.from_input(key, value) for key, value in data.items()]
+        )
+        return await self._priority_request.post(
+            url=f"{self.base_url}/{endpoint}", request_data=request_data, **kwargs
+        )
+
+    async def get_raw_updates(self, offset: Optional[int] = None, limit: int = 100, timeout: int = 0,
+                              allowed_updates: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        getUpdates returning Telegram's JSON as is, skipping the Update objects
+        get_updates builds for every update
+        """
+        data = {"offset": offset, "limit": limit, "timeout": timeout, "allowed_updates": allowed_updates}
+        read_timeout = (self._request[0].read_timeout or 0) + timeout
+        return await self._post("getUpdates", data, read_timeout=read_timeout)
+
+    async def iter_file(self, file_url: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        Stream a file from Telegram's file server over this bot's keep-alive
+        connections, chunk by chunk, without reading the whole body into memory
+        """
+        async with self.in_use(), self._http_client.stream("GET", file_url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(chunk_size):
+                yield chunk
+
+
+@dataclass
+class _PoolEntry:
+    bot: PooledBot
+    loop: asyncio.AbstractEventLoop
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class BotPool:
+    """
+    Keeps one initialized Bot (and its HTTPX keep-alive connection pool) per token.
+
+    A Bot's HTTP client is bound to the event loop it was initialized on, so each
+    entry remembers its loop and is only handed out for that loop.
+    """
+
+    def __init__(self, idle_timeout: float = BOT_IDLE_TIMEOUT,
+                 connection_pool_size: int = CONNECTION_POOL_SIZE):
+        self.idle_timeout = idle_timeout
+        self.connection_pool_size = connection_pool_size
+        self._entries: Dict[str, _PoolEntry] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _build_bot(self, token: str) -> PooledBot:
+        request = HTTPXRequest(
+            connection_pool_size=self.connection_pool_size,
+            pool_timeout=POOL_TIMEOUT
+        )
+        priority_request = HTTPXRequest(
+            pool_timeout=POOL_TIMEOUT,
+            httpx_kwargs={"limits": httpx.Limits(
+                max_connections=PRIORITY_POOL_SIZE, keepalive_expiry=PRIORITY_KEEPALIVE
+            )}
+        )
+        return PooledBot(token=token, request=request, priority_request=priority_request)
+
+    def acquire(self, token: str, loop: asyncio.AbstractEventLoop) -> PooledBot:
+        """Return an initialized Bot for the token, creating it on first use"""
+        key = token_key(token)
+        now = time.monotonic()
+
+        stale: Optional[_PoolEntry] = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.loop is loop and not loop.is_closed():
+                entry.last_used = now
+                bot = entry.bot
+            else:
+                stale = self._entries.pop(key, None)
+                bot = None
+
+        if stale:
+            self._close(stale)
+            stale = None
+
+        if bot is None:
+            bot = self._build_bot(token)
+            try:
+                self._run(bot.initialize(), loop)
+            except BaseException as e:
+                # Don't leak the connection pools of a bot that never made it into the pool
+                self._close(_PoolEntry(bot=bot, loop=loop))
+                if isinstance(e, InvalidToken):
+                    # Bot.initialize() quotes the raw token in its message
+                    raise InvalidToken("The bot token was rejected by Telegram") from None
+                raise
+            with self._lock:
+                existing = self._entries.get(key)
+                if existing and existing.loop is loop:
+                    # Another caller won the race; keep theirs
+                    stale, bot = _PoolEntry(bot=bot, loop=loop), existing.bot
+                else:
+                    self._entries[key] = _PoolEntry(bot=bot, loop=loop, last_used=now)
+            if stale:
+                self._close(stale)
+            logger.debug(f"Initialized pooled bot {key[:8]}")
+
+        if now - self._last_sweep > EVICTION_INTERVAL:
+            self.evict_idle()
+
+        return bot
+
+    def evict_idle(self) -> int:
+        """
+        Shut down bots that have not been used within idle_timeout. A bot with a
+        call in flight is never idle, however long ago it was acquired
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._last_sweep = now
+            idle = [
+                key for key, entry in self._entries.items()
+                if entry.loop.is_closed() or (
+                    not entry.bot.busy
+                    and now - max(entry.last_used, entry.bot.last_active) > self.idle_timeout
+                )
+            ]
+            evicted = [self._entries.pop(key) for key in idle]
+
+        for entry in evicted:
+            self._close(entry)
+        if evicted:
+            logger.debug(f"Evicted {len(evicted)} idle bot(s)")
+        return len(evicted)
+
+    def shutdown(self) -> None:
+        """Shut down every pooled bot"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._close(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _run(coro, loop: asyncio.AbstractEventLoop):
+        if loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(coro, loop)
+            try:
+                return future.result(LIFECYCLE_TIMEOUT)
+            except FutureTimeoutError:
+                future.cancel()
+                raise
+        return loop.run_until_complete(coro)
+
+    @staticmethod
+    def _close(entry: _PoolEntry) -> None:
+        loop = entry.loop
+        if loop.is_closed():
+            return
+        try:
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(entry.bot.shutdown(), loop).result(LIFECYCLE_TIMEOUT)
+            else:
+                loop.run_until_complete(entry.bot.shutdown())
+        except Exception as e:
+            logger.warning(f"Failed to shut down pooled bot: {str(e)}")
+
+
+bot_pool = BotPool()
+atexit.register(bot_pool.shutdown)
@@ -0,0 +1,89 @@
+"""
+In-process TTL caches for chat metadata shared by all tools
+"""
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+import threading
+import time
+
+# Default staleness for cached chat info and member counts, in seconds
+CHAT_CACHE_TTL = 300
+CHAT_CACHE_SIZE = 2048
+# Member status changes more often than chat info, so it goes stale sooner
+MEMBER_CACHE_TTL = 60
+MEMBER_CACHE_SIZE = 10000
+# Last content rendered into a message by an edit, to skip identical edits
+EDIT_CACHE_TTL = 3600
+EDIT_CACHE_SIZE = 4096
+# Telegram guarantees file download links for at least an hour
+FILE_INFO_TTL = 3000
+FILE_INFO_CACHE_SIZE = 4096
+# Inline result corpora are resent with every keystroke; keep their indexes a while
+INLINE_INDEX_TTL = 600
+INLINE_INDEX_CACHE_SIZE = 32
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after ttl seconds.
+
+    get() accepts a stricter max_age per lookup, so callers can decide how
+    stale a value they are willing to use (max_age=0 always misses).
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None, max_age: Optional[float] = None) -> Any:
+        max_age = self.ttl if max_age is None else min(max_age, self.ttl)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] >= max_age:
+                if entry is not None and now - entry[0] >= self.ttl:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# (bot key, chat id or @username) -> Chat
+chat_cache = TTLCache(CHAT_CACHE_TTL, CHAT_CACHE_SIZE)
+# (bot key, chat id or @username) -> member count
+member_count_cache = TTLCache(CHAT_CACHE_TTL, CHAT_CACHE_SIZE)
+# (bot key, chat id or @username) -> {user_id: ChatMember} of the chat's administrators
+admin_cache = TTLCache(CHAT_CACHE_TTL, CHAT_CACHE_SIZE)
+# (bot key, chat id or @username, user id) -> ChatMember
+member_cache = TTLCache(MEMBER_CACHE_TTL, MEMBER_CACHE_SIZE)
+# (bot key, file_id) -> File, including its download path
+file_info_cache = TTLCache(FILE_INFO_TTL, FILE_INFO_CACHE_SIZE)
+# (bot key, chat id or @username, message id, edit method) -> hash of the content
+edit_cache = TTLCache(EDIT_CACHE_TTL, EDIT_CACHE_SIZE)
+# sha256 of an inline query result corpus -> ResultIndex
+inline_index_cache = TTLCache(INLINE_INDEX_TTL, INLINE_INDEX_CACHE_SIZE)
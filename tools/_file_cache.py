@@ -0,0 +1,216 @@
+"""
+On-disk cache of downloaded Telegram files, keyed by file_unique_id
+"""
+from collections import OrderedDict
+from typing import Iterator, Optional
+import logging
+import mmap
+import os
+import re
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Directory for cached downloads; set TELEGRAM_FILE_CACHE_DIR to an empty value to disable
+FILE_CACHE_DIR = os.environ.get(
+    "TELEGRAM_FILE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "telegram-file-cache")
+)
+# Least recently used files are evicted once the cache grows past this many bytes
+FILE_CACHE_MAX_BYTES = int(os.environ.get("TELEGRAM_FILE_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+READ_BLOCK_SIZE = 256 * 1024
+
+# file_unique_id is URL-safe base64; anything else must never become a path
+_UNIQUE_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,128}')
+_TMP_SUFFIX = ".part"
+
+
+class FileCache:
+    """
+    Content-addressed file store with LRU eviction by total size.
+
+    Writes go to a temporary file in the cache directory and are renamed into
+    place when complete, so readers never see partial files. Reads are served
+    from a memory map, letting the OS page the file in instead of copying it.
+    """
+
+    def __init__(self, directory: Optional[str], max_bytes: int = FILE_CACHE_MAX_BYTES):
+        self.directory = directory or None
+        self.max_bytes = max_bytes
+        # file_unique_id -> size, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                self._load()
+            except OSError as e:
+                logger.warning(f"Disabling file cache, {self.directory} is unusable: {str(e)}")
+                self.directory = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None and self.max_bytes > 0
+
+    def _path(self, unique_id: str) -> str:
+        if not _UNIQUE_ID_PATTERN.fullmatch(unique_id):
+            raise ValueError(f"invalid file_unique_id: {unique_id!r}")
+        return os.path.join(self.directory, unique_id)
+
+    def _load(self) -> None:
+        """Index files left by earlier runs, oldest access first, and drop partial writes"""
+        found = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(_TMP_SUFFIX):
+                os.remove(entry.path)
+            elif _UNIQUE_ID_PATTERN.fullmatch(entry.name):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, unique_id, size in sorted(found):
+            self._entries[unique_id] = size
+            self._total += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and self._entries:
+            unique_id, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(os.path.join(self.directory, unique_id))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to evict cached file {unique_id}: {str(e)}")
+
+    def size_of(self, unique_id: str) -> Optional[int]:
+        """Size of the cached file, or None when it isn't cached. Counts as a use for LRU"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            size = self._entries.get(unique_id)
+            if size is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(unique_id)
+            self.hits += 1
+        try:
+            # Persist recency across restarts
+            os.utime(self._path(unique_id))
+        except FileNotFoundError:
+            self.discard(unique_id)
+            return None
+        except OSError:
+            pass
+        return size
+
+    def iter_blocks(self, unique_id: str, block_size: int = READ_BLOCK_SIZE) -> Iterator[bytes]:
+        """Read a cached file through a memory map, block by block"""
+        with open(self._path(unique_id), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(0, len(mapped), block_size):
+                    yield mapped[offset:offset + block_size]
+
+    def writer(self, unique_id: str) -> "CacheWriter":
+        return CacheWriter(self, unique_id)
+
+    def _commit(self, unique_id: str, tmp_path: str, size: int) -> bool:
+        if size > self.max_bytes:
+            return False
+        os.replace(tmp_path, self._path(unique_id))
+        with self._lock:
+            self._total -= self._entries.pop(unique_id, 0)
+            self._entries[unique_id] = size
+            self._total += size
+            self._evict()
+        return True
+
+    def discard(self, unique_id: str) -> None:
+        with self._lock:
+            size = self._entries.pop(unique_id, None)
+            if size is None:
+                return
+            self._total -= size
+        try:
+            os.remove(self._path(unique_id))
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self._entries),
+            "total_bytes": self._total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+class CacheWriter:
+    """
+    Writes one file into the cache; call commit() once all data was written.
+    Used as a context manager, an uncommitted file is discarded on exit, and
+    until then iter_written() can still read it back
+    """
+
+    def __init__(self, cache: FileCache, unique_id: str):
+        self.cache = cache
+        self.unique_id = unique_id
+        self.size = 0
+        self._file = None
+        self._tmp_path = None
+        if cache.enabled:
+            cache._path(unique_id)  # validates the id
+            fd, self._tmp_path = tempfile.mkstemp(dir=cache.directory, prefix=f"{unique_id}.", suffix=_TMP_SUFFIX)
+            self._file = os.fdopen(fd, 'wb')
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self._file is not None:
+            self._file.write(data)
+
+    def commit(self) -> bool:
+        """Move the file into the cache; returns False when it was not cached"""
+        if self._file is None:
+            return False
+        self._file.close()
+        self._file = None
+        try:
+            committed = self.cache._commit(self.unique_id, self._tmp_path, self.size)
+        except OSError as e:
+            logger.warning(f"Failed to cache file {self.unique_id}: {str(e)}")
+            return False
+        if committed:
+            self._tmp_path = None
+        return committed
+
+    def iter_written(self, block_size: int = READ_BLOCK_SIZE) -> Iterator[bytes]:
+        """Read back a file that commit() did not cache, e.g. one larger than the whole cache"""
+        with open(self._tmp_path, 'rb') as f:
+            yield from iter(lambda: f.read(block_size), b"")
+
+    def abort(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._tmp_path:
+            try:
+                os.remove(self._tmp_path)
+            except OSError:
+                pass
+            self._tmp_path = None
+
+    def __enter__(self) -> "CacheWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.abort()
+
+
+file_cache = FileCache(FILE_CACHE_DIR)
@@ -1,24 +1,60 @@
 """
 Helper functions for Telegram tools
 """
+from dify_plugin.entities.tool import ToolInvokeMessage
 from telegram import Bot
-from telegram.error import TelegramError
-import asyncio
-from typing import Any, Dict
+from telegram.error import BadRequest, TelegramError
+from tools._loop import event_loop
+from tools._bot_pool import bot_pool
+from tools._retry import with_deadline
+from tools._rate_limit import is_private_chat
+from tools._scheduler import BULK, with_priority
+from tools._upload_cache import file_id_cache, media_cache_key, extract_file_id
+from tools._cache import chat_cache, member_count_cache, admin_cache, member_cache, file_info_cache, edit_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import hashlib
+import json
 import logging
+import os
+import re
+import time
+import uuid
 
 logger = logging.getLogger(__name__)
 
+# Plugin-wide request budget, keep in sync with MAX_REQUEST_TIMEOUT in main.py
+MAX_REQUEST_TIMEOUT = 120
+
+# Telegram accepts up to 100 ids per deleteMessages/forwardMessages/copyMessages call
+BULK_CHUNK_SIZE = 100
+# Upper bound for ids accepted by a single bulk tool call
+MAX_BULK_IDS = 10000
+# Ids per forwardMessages/copyMessages request, sized so the target chat's rate limit
+# lets a chunk through well within one request budget: Telegram counts every message,
+# at one per second in a private chat and 20 per minute in a group or channel
+PRIVATE_RELAY_CHUNK_SIZE = 50
+GROUP_RELAY_CHUNK_SIZE = 20
+# Upper bounds for the ids and the time of a single forward or copy call
+MAX_RELAY_IDS = 1000
+MAX_RELAY_DURATION = 1800
+
+# Bot API file downloads are limited to 20 MB
+MAX_DOWNLOAD_SIZE = 20 * 1024 * 1024
+# Blob chunk size used by the plugin runtime when it splits blob messages
+BLOB_CHUNK_SIZE = 8192
+
 
 def get_bot(credentials: dict) -> Bot:
-    """Create and return a Telegram Bot instance"""
+    """Return the pooled, initialized Telegram Bot instance for these credentials"""
     bot_token = credentials.get("bot_token")
-    return Bot(token=bot_token)
+    return bot_pool.acquire(bot_token, event_loop.loop)
 
 
 async def execute_telegram_action(bot: Bot, action_func, *args, **kwargs) -> Dict[str, Any]:
     """
     Execute a Telegram bot action with proper error handling
+    Flood waits, network errors and chat migrations are already retried by the
+    pooled bot (see tools/_retry.py); whatever still fails is returned as an error
     """
     try:
         result = await action_func(*args, **kwargs)
@@ -43,20 +79,333 @@ async def execute_telegram_action(bot: Bot, action_func, *args, **kwargs) -> Dic
         }
 
 
-def run_async(coro):
-    """Run async function in sync context"""
+def run_async(coro, timeout: Optional[float] = MAX_REQUEST_TIMEOUT, priority: Optional[str] = None):
+    """
+    Run async function in sync context on the shared background event loop
+    Raises TimeoutError (and cancels the coroutine) if it does not finish in time;
+    retries inside the coroutine stop early rather than overrun the timeout.
+    Sends made by the coroutine are scheduled in the given priority class
+    (tools._scheduler.INTERACTIVE, NORMAL or BULK; NORMAL by default)
+    """
+    if priority is not None:
+        coro = with_priority(coro, priority)
+    return event_loop.run(with_deadline(coro, timeout), timeout=timeout)
+
+
+async def send_media(bot: Bot, kind: str, media: str, **kwargs):
+    """
+    Send media of the given kind ("photo", "video", "document", ...) with
+    bot.send_<kind>. media may be a URL, a local file path or a file_id.
+    Local files and URLs are looked up in the file_id cache first, so content
+    Telegram already has is sent by reference instead of being uploaded again
+    """
+    send = getattr(bot, f"send_{kind}")
+
+    cache_key = await media_cache_key(bot, kind, media)
+    if cache_key:
+        file_id = file_id_cache.get(cache_key)
+        if file_id:
+            try:
+                return await send(**{kind: file_id}, **kwargs)
+            except BadRequest as e:
+                if "file" not in str(e).lower():
+                    raise
+                # The file_id expired or was issued for different content
+                logger.info(f"Cached file_id rejected, uploading again: {str(e)}")
+                file_id_cache.discard(cache_key)
+
+    if os.path.isfile(media):
+        with open(media, 'rb') as media_file:
+            message = await send(**{kind: media_file}, **kwargs)
+    else:
+        message = await send(**{kind: media}, **kwargs)
+
+    if cache_key:
+        file_id = extract_file_id(message, kind)
+        if file_id:
+            file_id_cache.put(cache_key, file_id)
+    return message
+
+
+def _chat_key(bot: Bot, chat_id) -> tuple:
+    return bot.key, str(chat_id).lower()
+
+
+async def get_chat_cached(bot: Bot, chat_id, max_age: Optional[float] = None):
+    """
+    Return the chat from the shared TTL cache, fetching it when missing or older
+    than max_age seconds. The chat is cached under both its id and @username
+    """
+    chat = chat_cache.get(_chat_key(bot, chat_id), max_age=max_age)
+    if chat is None:
+        chat = await bot.get_chat(chat_id=chat_id)
+        chat_cache.set(_chat_key(bot, chat_id), chat)
+        chat_cache.set(_chat_key(bot, chat.id), chat)
+        if chat.username:
+            chat_cache.set(_chat_key(bot, f"@{chat.username}"), chat)
+    return chat
+
+
+async def get_member_count_cached(bot: Bot, chat_id, max_age: Optional[float] = None) -> int:
+    """Return the chat's member count from the shared TTL cache, fetching it when stale"""
+    count = member_count_cache.get(_chat_key(bot, chat_id), max_age=max_age)
+    if count is None:
+        count = await bot.get_chat_member_count(chat_id=chat_id)
+        member_count_cache.set(_chat_key(bot, chat_id), count)
+    return count
+
+
+def _chat_aliases(bot: Bot, chat_id) -> List[tuple]:
+    """Cache keys for a chat: the given id plus its numeric id and @username, if known"""
+    keys = [_chat_key(bot, chat_id)]
+    chat = chat_cache.get(keys[0])
+    if chat is not None:
+        keys.append(_chat_key(bot, chat.id))
+        if chat.username:
+            keys.append(_chat_key(bot, f"@{chat.username}"))
+    return keys
+
+
+def invalidate_chat_cache(bot: Bot, chat_id) -> None:
+    """Drop cached info for a chat after it was changed through this plugin"""
+    for key in _chat_aliases(bot, chat_id):
+        chat_cache.pop(key)
+
+
+async def get_admins_cached(bot: Bot, chat_id, max_age: Optional[float] = None) -> Dict[int, Any]:
+    """
+    Return the chat's administrators as {user_id: ChatMember} from the shared
+    TTL cache, fetching the roster when missing or older than max_age seconds
+    """
+    admins = admin_cache.get(_chat_key(bot, chat_id), max_age=max_age)
+    if admins is None:
+        members = await bot.get_chat_administrators(chat_id=chat_id)
+        admins = {member.user.id: member for member in members}
+        admin_cache.set(_chat_key(bot, chat_id), admins)
+    return admins
+
+
+def invalidate_admin_cache(bot: Bot, chat_id) -> None:
+    """Drop the cached administrator roster after a member was promoted, banned or restricted"""
+    for key in _chat_aliases(bot, chat_id):
+        admin_cache.pop(key)
+
+
+async def get_member_cached(bot: Bot, chat_id, user_id, max_age: Optional[float] = None,
+                            pace: Optional[Callable[[], Awaitable[Any]]] = None):
+    """
+    Return a user's ChatMember from the shared short-TTL cache, fetching it when
+    stale. pace, if given, is awaited before a lookup that has to go to Telegram
+    """
+    key = (*_chat_key(bot, chat_id), int(user_id))
+    member = member_cache.get(key, max_age=max_age)
+    if member is None:
+        if pace is not None:
+            await pace()
+        member = await bot.get_chat_member(chat_id=chat_id, user_id=user_id)
+        member_cache.set(key, member)
+    return member
+
+
+def invalidate_member_cache(bot: Bot, chat_id, user_id) -> None:
+    """
+    Drop a user's cached membership after it was changed through this plugin,
+    together with the chat's admin roster the change may have affected
+    """
+    for key in _chat_aliases(bot, chat_id):
+        member_cache.pop((*key, int(user_id)))
+    invalidate_admin_cache(bot, chat_id)
+
+
+async def get_file_cached(bot: Bot, file_id: str):
+    """Return the File for file_id, reusing it while its download link is still valid"""
+    key = (bot.key, file_id)
+    file = file_info_cache.get(key)
+    if file is None:
+        file = await bot.get_file(file_id=file_id)
+        file_info_cache.set(key, file)
+    return file
+
+
+async def edit_if_changed(bot: Bot, method: str, chat_id, message_id, **content):
+    """
+    Call bot.<method> (edit_message_text, edit_message_caption, ...) unless the
+    same content was already put into this message through the plugin.
+    Returns the edited Message, or None when the edit was a no-op (skipped
+    locally, or answered with "message is not modified")
+    """
+    key = (*_chat_key(bot, chat_id), int(message_id), method)
+    digest = hashlib.sha256(json.dumps(
+        content, sort_keys=True, default=lambda value: value.to_dict() if hasattr(value, "to_dict") else str(value)
+    ).encode("utf-8")).hexdigest()
+    if edit_cache.get(key) == digest:
+        return None
+
+    try:
+        message = await getattr(bot, method)(chat_id=chat_id, message_id=message_id, **content)
+    except BadRequest as e:
+        if "not modified" not in str(e).lower():
+            raise
+        message = None
+    edit_cache.set(key, digest)
+    return message
+
+
+def iter_async(agen: AsyncIterator, step_timeout: Optional[float] = MAX_REQUEST_TIMEOUT,
+               priority: Optional[str] = None) -> Iterator:
+    """
+    Drive an async generator on the shared event loop from sync code, yielding
+    each item as soon as it is produced (used to stream progress messages)
+    Each item must arrive within step_timeout; the generator is closed on exit.
+    priority works as in run_async
+    """
+    try:
+        while True:
+            try:
+                step = agen.__anext__()
+                if priority is not None:
+                    step = with_priority(step, priority)
+                yield event_loop.run(with_deadline(step, step_timeout), timeout=step_timeout)
+            except StopAsyncIteration:
+                return
+    finally:
+        event_loop.run(agen.aclose(), timeout=step_timeout)
+
+
+def relay_messages(bot: Bot, method: str, chat_id, from_chat_id, message_ids: List[int],
+                   **kwargs) -> Iterator[Tuple[int, List[int], Optional[str]]]:
+    """
+    Forward or copy messages with bot.<method> ("forward_messages" or
+    "copy_messages") as bulk sends, one chunk per request. Telegram requires
+    strictly increasing ids, and chunks go out one after another so the
+    messages keep their original order in the target chat.
+    Yields (ids processed, new message ids, error) after every chunk, so the
+    caller can report progress and keeps the partial result when a chunk fails,
+    times out or the call runs past MAX_RELAY_DURATION; error is only set on
+    the last item
+    """
+    size = PRIVATE_RELAY_CHUNK_SIZE if is_private_chat(chat_id) else GROUP_RELAY_CHUNK_SIZE
+    chunks = chunked(sorted(message_ids), size)
+    deadline = time.monotonic() + MAX_RELAY_DURATION
+
+    async def relay():
+        for chunk in chunks:
+            result = await getattr(bot, method)(
+                chat_id=chat_id, from_chat_id=from_chat_id, message_ids=chunk, **kwargs
+            )
+            yield len(chunk), [item.message_id for item in result]
+
+    processed = 0
+    new_ids: List[int] = []
+    steps = iter_async(relay(), priority=BULK)
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # Create new loop if one is already running
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        return loop.run_until_complete(coro)
-    except RuntimeError:
-        # If event loop issues, create fresh loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        return loop.run_until_complete(coro)
+        for count, chunk_ids in steps:
+            processed += count
+            new_ids.extend(chunk_ids)
+            if processed < len(message_ids) and time.monotonic() >= deadline:
+                yield processed, new_ids, f"stopped after the time limit of {MAX_RELAY_DURATION} seconds"
+                return
+            yield processed, new_ids, None
+    except Exception as e:
+        yield processed, new_ids, str(e)
+    finally:
+        steps.close()
+
+
+def create_blob_chunks(blocks: Iterable[bytes], total_length: int,
+                       meta: Optional[dict] = None) -> Iterator[ToolInvokeMessage]:
+    """
+    Emit content as a stream of blob chunk messages, like the plugin runtime does
+    for a blob message, without ever holding the whole content in memory.
+    Raises ValueError if blocks don't add up to exactly total_length bytes
+    """
+    blob_id = uuid.uuid4().hex
+    sequence = 0
+    sent = 0
+    for block in blocks:
+        for offset in range(0, len(block), BLOB_CHUNK_SIZE):
+            chunk = block[offset:offset + BLOB_CHUNK_SIZE]
+            sent += len(chunk)
+            if sent > total_length:
+                raise ValueError(f"content exceeds the announced {total_length} bytes")
+            yield ToolInvokeMessage(
+                type=ToolInvokeMessage.MessageType.BLOB_CHUNK,
+                message=ToolInvokeMessage.BlobChunkMessage(
+                    id=blob_id, sequence=sequence, total_length=total_length, blob=chunk, end=False
+                ),
+                meta=meta
+            )
+            sequence += 1
+    if sent != total_length:
+        raise ValueError(f"content ended after {sent} of {total_length} bytes")
+
+    yield ToolInvokeMessage(
+        type=ToolInvokeMessage.MessageType.BLOB_CHUNK,
+        message=ToolInvokeMessage.BlobChunkMessage(
+            id=blob_id, sequence=sequence, total_length=total_length, blob=b"", end=True
+        ),
+        meta=meta
+    )
+
+
+def parse_id_list(value: Any) -> List[str]:
+    """
+    Parse a list of identifiers from a JSON array, or a string separated by
+    commas, semicolons, whitespace or newlines. Duplicates are dropped, order kept
+    """
+    if value is None or value == "":
+        return []
+
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped.startswith('['):
+            value = json.loads(stripped)
+        else:
+            value = re.split(r'[\s,;]+', stripped)
+    elif not isinstance(value, (list, tuple)):
+        value = [value]
+
+    seen = set()
+    ids = []
+    for item in value:
+        item = str(item).strip()
+        if item and item not in seen:
+            seen.add(item)
+            ids.append(item)
+    return ids
+
+
+def parse_message_ids(value: Any, limit: int = MAX_BULK_IDS) -> List[int]:
+    """
+    Parse message ids from anything parse_id_list accepts, where an item may
+    also be an inclusive range such as "100-200". Raises ValueError on bad input
+    or when more than limit ids are requested
+    """
+    message_ids = []
+    seen = set()
+    for item in parse_id_list(value):
+        if re.fullmatch(r'\d+-\d+', item):
+            start, end = (int(part) for part in item.split('-'))
+            if end < start:
+                start, end = end, start
+            if end - start + 1 > limit:
+                raise ValueError(f"range {item} exceeds {limit} messages")
+            ids = range(start, end + 1)
+        else:
+            ids = [int(item)]
+
+        for message_id in ids:
+            if message_id not in seen:
+                seen.add(message_id)
+                message_ids.append(message_id)
+        if len(message_ids) > limit:
+            raise ValueError(f"at most {limit} message ids are supported per call")
+    return message_ids
+
+
+def chunked(items: List[Any], size: int) -> List[List[Any]]:
+    """Split a list into consecutive chunks of at most size items"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
 
 def format_message_result(message) -> Dict[str, Any]:
@@ -0,0 +1,210 @@
+"""
+Searchable, paginated index of inline query results
+"""
+from bisect import bisect_left
+from collections import OrderedDict
+from telegram import (
+    InlineQueryResult, InlineQueryResultArticle, InlineQueryResultAudio, InlineQueryResultCachedAudio,
+    InlineQueryResultCachedDocument, InlineQueryResultCachedGif, InlineQueryResultCachedMpeg4Gif,
+    InlineQueryResultCachedPhoto, InlineQueryResultCachedSticker, InlineQueryResultCachedVideo,
+    InlineQueryResultCachedVoice, InlineQueryResultContact, InlineQueryResultDocument, InlineQueryResultGame,
+    InlineQueryResultGif, InlineQueryResultLocation, InlineQueryResultMpeg4Gif, InlineQueryResultPhoto,
+    InlineQueryResultVenue, InlineQueryResultVideo, InlineQueryResultVoice, InputTextMessageContent
+)
+from tools._cache import inline_index_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+import hashlib
+import json
+import re
+import threading
+
+# Telegram accepts at most 50 results per answerInlineQuery
+INLINE_PAGE_SIZE = 50
+# Rendered pages and query matches kept per index
+PAGE_CACHE_SIZE = 256
+
+_TOKEN = re.compile(r'\w+')
+# Result fields whose text is searchable
+_TEXT_FIELDS = (
+    "title", "description", "caption", "message_text", "performer",
+    "first_name", "last_name", "address", "game_short_name"
+)
+
+_RESULT_CLASSES = {
+    "article": InlineQueryResultArticle,
+    "photo": InlineQueryResultPhoto,
+    "gif": InlineQueryResultGif,
+    "mpeg4_gif": InlineQueryResultMpeg4Gif,
+    "video": InlineQueryResultVideo,
+    "audio": InlineQueryResultAudio,
+    "voice": InlineQueryResultVoice,
+    "document": InlineQueryResultDocument,
+    "location": InlineQueryResultLocation,
+    "venue": InlineQueryResultVenue,
+    "contact": InlineQueryResultContact,
+    "game": InlineQueryResultGame,
+}
+# Results that reference a file already on Telegram's servers, by the field holding its file_id
+_CACHED_RESULT_CLASSES = {
+    "photo_file_id": InlineQueryResultCachedPhoto,
+    "gif_file_id": InlineQueryResultCachedGif,
+    "mpeg4_file_id": InlineQueryResultCachedMpeg4Gif,
+    "video_file_id": InlineQueryResultCachedVideo,
+    "audio_file_id": InlineQueryResultCachedAudio,
+    "voice_file_id": InlineQueryResultCachedVoice,
+    "document_file_id": InlineQueryResultCachedDocument,
+    "sticker_file_id": InlineQueryResultCachedSticker,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.casefold())
+
+
+def _searchable_text(item: Dict[str, Any]) -> str:
+    parts = [str(item[field]) for field in _TEXT_FIELDS if item.get(field)]
+    content = item.get("input_message_content")
+    if isinstance(content, dict) and content.get("message_text"):
+        parts.append(str(content["message_text"]))
+    keywords = item.get("keywords")
+    if keywords:
+        parts.append(" ".join(keywords) if isinstance(keywords, list) else str(keywords))
+    return " ".join(parts)
+
+
+def render_result(item: Dict[str, Any], position: int) -> InlineQueryResult:
+    """
+    Build the InlineQueryResult for a result given as Bot API JSON. Articles may
+    use the shorthand message_text instead of input_message_content
+    """
+    data = {key: value for key, value in item.items() if key not in ("type", "keywords")}
+    data.setdefault("id", str(position))
+    data["id"] = str(data["id"])
+    if "thumb_url" in data:
+        data.setdefault("thumbnail_url", data.pop("thumb_url"))
+    result_type = item.get("type", "article")
+
+    if result_type == "article" and "input_message_content" not in data:
+        data["input_message_content"] = InputTextMessageContent(message_text=data.pop("message_text", ""))
+        data.setdefault("title", "")
+
+    cls = next((cached for field, cached in _CACHED_RESULT_CLASSES.items() if field in data), None)
+    cls = cls or _RESULT_CLASSES.get(result_type)
+    if cls is None:
+        raise ValueError(f"result {position} has no file_id for type {result_type!r}")
+    return cls.de_json(data, None)
+
+
+class ResultIndex:
+    """
+    Token index over a corpus of inline query results.
+
+    A query matches results containing every query word as a word prefix, so
+    results narrow down as the user types. Matches keep corpus order; rendered
+    pages are cached per (query, offset) so repeated keystrokes and scrolling
+    don't rebuild result objects.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ValueError(f"result {position} is not an object")
+            result_type = item.get("type", "article")
+            if result_type not in _RESULT_CLASSES and result_type != "sticker":
+                raise ValueError(f"result {position} has unsupported type {result_type!r}")
+
+        self.items = items
+        postings: Dict[str, List[int]] = {}
+        for position, item in enumerate(items):
+            for token in dict.fromkeys(tokenize(_searchable_text(item))):
+                postings.setdefault(token, []).append(position)
+        self._postings = postings
+        # Sorted vocabulary: all tokens sharing a prefix are adjacent
+        self._tokens = sorted(postings)
+        self._matches: "OrderedDict[Tuple[str, ...], List[int]]" = OrderedDict()
+        self._pages: "OrderedDict[Tuple[Tuple[str, ...], int], List[InlineQueryResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _prefix_matches(self, prefix: str) -> set:
+        positions = set()
+        index = bisect_left(self._tokens, prefix)
+        while index < len(self._tokens) and self._tokens[index].startswith(prefix):
+            positions.update(self._postings[self._tokens[index]])
+            index += 1
+        return positions
+
+    def search(self, query: str) -> List[int]:
+        """Positions of the results matching query, in corpus order"""
+        words = tuple(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            cached = self._matches.get(words)
+            if cached is not None:
+                self._matches.move_to_end(words)
+                return cached
+
+        if not words:
+            matches = list(range(len(self.items)))
+        else:
+            # Longest words first: they usually match the fewest results
+            positions = None
+            for word in sorted(words, key=len, reverse=True):
+                found = self._prefix_matches(word)
+                positions = found if positions is None else positions & found
+                if not positions:
+                    break
+            matches = sorted(positions)
+
+        with self._lock:
+            self._matches[words] = matches
+            while len(self._matches) > PAGE_CACHE_SIZE:
+                self._matches.popitem(last=False)
+        return matches
+
+    def page(self, query: str, offset: Optional[str] = None,
+             page_size: int = INLINE_PAGE_SIZE) -> Tuple[List[InlineQueryResult], str, int, bool]:
+        """
+        Results for the page at offset (the InlineQuery.offset Telegram sends,
+        empty for the first page). Returns (results, next_offset, total matches,
+        whether the page came from the cache); next_offset is empty on the last page
+        """
+        start = int(offset) if offset and str(offset).isdigit() else 0
+        matches = self.search(query)
+        end = min(start + page_size, len(matches))
+        next_offset = str(end) if end < len(matches) else ""
+
+        key = (tuple(dict.fromkeys(tokenize(query))), start)
+        with self._lock:
+            results = self._pages.get(key)
+            if results is not None:
+                self._pages.move_to_end(key)
+                return results, next_offset, len(matches), True
+
+        results = [render_result(self.items[position], position) for position in matches[start:end]]
+        with self._lock:
+            self._pages[key] = results
+            while len(self._pages) > PAGE_CACHE_SIZE:
+                self._pages.popitem(last=False)
+        return results, next_offset, len(matches), False
+
+
+def get_result_index(results: Union[str, List[Dict[str, Any]]]) -> Tuple[ResultIndex, bool]:
+    """
+    Index for a result corpus given as a JSON string or a list, built on first
+    use and reused while the same corpus keeps coming in. Returns (index,
+    whether it was cached). Raises ValueError for invalid results
+    """
+    raw = results if isinstance(results, str) else json.dumps(results, sort_keys=True)
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    index = inline_index_cache.get(digest)
+    if index is not None:
+        return index, True
+
+    items = json.loads(raw) if isinstance(results, str) else results
+    if not isinstance(items, list):
+        raise ValueError("results must be a JSON array")
+    index = ResultIndex(items)
+    inline_index_cache.set(digest, index)
+    return index, False
@@ -0,0 +1,94 @@
+"""
+Long-lived background event loop shared by all Telegram tools
+"""
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Coroutine, Optional
+import asyncio
+import atexit
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class LoopThread:
+    """
+    Runs one asyncio event loop forever in a daemon thread.
+
+    Tools submit coroutines from their (synchronous) invoke thread and wait on a
+    thread-safe future, so bots, connection pools, caches and rate limiters
+    created on the loop survive across tool invocations.
+    """
+
+    def __init__(self, name: str = "telegram-event-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running background loop, started on first access"""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._thread.is_alive():
+            loop = self._start()
+        return loop
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop and not self._loop.is_closed() and self._thread.is_alive():
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                try:
+                    loop.run_forever()
+                finally:
+                    loop.close()
+
+            thread = threading.Thread(target=run, name=self.name, daemon=True)
+            thread.start()
+            ready.wait()
+
+            self._loop = loop
+            self._thread = thread
+            logger.debug(f"Started background event loop thread {self.name}")
+            return loop
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the background loop"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the background loop and block until it finishes"""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("run() cannot be called from the event loop thread")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Telegram request did not finish within {timeout} seconds")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the loop and wait for its thread to exit"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop and not loop.is_closed():
+            loop.call_soon_threadsafe(loop.stop)
+        if thread:
+            thread.join(timeout)
+
+
+event_loop = LoopThread()
+atexit.register(event_loop.stop)
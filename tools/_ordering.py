@@ -0,0 +1,57 @@
+"""
+Per-chat FIFO ordering of outgoing sends
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Union
+import asyncio
+
+
+class _ChatQueue:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        # asyncio.Lock wakes waiters in the order they started waiting
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class ChatSequencer:
+    """
+    Runs sends to the same chat one at a time, in the order they were made,
+    while sends to different chats proceed in parallel.
+
+    A send holds its chat's turn through rate limiting and retries, so a
+    message that hits flood control or a network error is still delivered
+    before the ones made after it. Must only be used from the event loop thread.
+    """
+
+    def __init__(self):
+        self._queues: Dict[str, _ChatQueue] = {}
+
+    @asynccontextmanager
+    async def hold(self, chat_id: Optional[Union[int, str]]) -> AsyncIterator[None]:
+        """Wait for chat_id's turn and keep it for the duration of the block"""
+        if chat_id is None:
+            yield
+            return
+
+        key = str(chat_id)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = _ChatQueue()
+        queue.users += 1
+        try:
+            async with queue.lock:
+                yield
+        finally:
+            queue.users -= 1
+            if not queue.users:
+                # Nobody waiting; don't keep a lock per chat ever seen
+                del self._queues[key]
+
+    def waiting(self) -> int:
+        """Sends currently holding or waiting for a chat's turn"""
+        return sum(queue.users for queue in self._queues.values())
+
+    def __len__(self) -> int:
+        return len(self._queues)
@@ -0,0 +1,183 @@
+"""
+Proxy uploads: stream a remote file straight into a multipart upload to Telegram
+"""
+from telegram import Message
+from telegram.error import BadRequest, ChatMigrated, Forbidden, NetworkError, RetryAfter, TelegramError
+from tools._retry import remaining_budget, with_retry
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import unquote, urlparse
+import httpx
+import json
+import logging
+import mimetypes
+import os
+import re
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Read size for the source body; at most one chunk per upload is held in memory
+PROXY_CHUNK_SIZE = 256 * 1024
+SOURCE_CONNECT_TIMEOUT = 10.0
+# Used when no request deadline is set
+UPLOAD_TIMEOUT = 600.0
+
+# Control characters and quotes would break out of the Content-Disposition header
+_UNSAFE_FILENAME_CHARS = re.compile(r'[\x00-\x1f\x7f"\\]')
+
+def _form_value(value: Any) -> str:
+    """Encode a parameter the way the Bot API expects it in multipart form data"""
+    if isinstance(value, str):
+        return value
+    if hasattr(value, "to_json"):
+        return value.to_json()
+    return json.dumps(value)
+
+
+def parse_source_headers(value: Any) -> Optional[Dict[str, str]]:
+    """
+    Parse the source_headers parameter, a JSON object of header names to values.
+    Raises ValueError unless it is one with only string names and values
+    """
+    if not value:
+        return None
+    headers = json.loads(value) if isinstance(value, str) else value
+    if not isinstance(headers, dict) or not all(
+            isinstance(name, str) and isinstance(header, str) for name, header in headers.items()
+    ):
+        raise ValueError("source_headers must be a JSON object of string header names and values")
+    return headers or None
+
+
+def _safe_filename(filename: str) -> str:
+    return _UNSAFE_FILENAME_CHARS.sub("", filename).strip() or "file"
+
+
+def _source_filename(response: httpx.Response, url: str) -> str:
+    disposition = response.headers.get("Content-Disposition", "")
+    for part in disposition.split(";"):
+        name, _, value = part.strip().partition("=")
+        if name.lower() == "filename" and value:
+            return _safe_filename(value.strip('"'))
+    return _safe_filename(os.path.basename(unquote(urlparse(url).path)))
+
+
+def _multipart_parts(fields: Dict[str, Any], kind: str, filename: str,
+                     content_type: str, boundary: str) -> Tuple[bytes, bytes]:
+    """Return the multipart bytes before and after the file content"""
+    head = b""
+    for name, value in fields.items():
+        if value is None:
+            continue
+        head += (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{_form_value(value)}\r\n"
+        ).encode("utf-8")
+    head += (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{kind}"; filename="{_safe_filename(filename)}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode("utf-8")
+    tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+    return head, tail
+
+
+def _raise_for_response(response: httpx.Response) -> Dict[str, Any]:
+    """Return the result of a Bot API response or raise the matching TelegramError"""
+    try:
+        data = response.json()
+    except ValueError:
+        raise NetworkError(f"Invalid server response ({response.status_code})")
+    if data.get("ok"):
+        return data["result"]
+
+    message = data.get("description") or f"HTTP {response.status_code}"
+    parameters = data.get("parameters") or {}
+    if parameters.get("migrate_to_chat_id"):
+        raise ChatMigrated(parameters["migrate_to_chat_id"])
+    if parameters.get("retry_after"):
+        raise RetryAfter(parameters["retry_after"])
+    if response.status_code == 400:
+        raise BadRequest(message)
+    if response.status_code == 403:
+        raise Forbidden(message)
+    if response.status_code >= 500:
+        raise NetworkError(message)
+    raise TelegramError(message)
+
+
+async def proxy_upload(bot, kind: str, url: str, source_headers: Optional[Dict[str, str]] = None,
+                       filename: Optional[str] = None, **fields) -> Message:
+    """
+    Send media of the given kind by streaming url's body straight into the
+    multipart request to Telegram, so the upload starts with the first bytes
+    downloaded and memory use stays at a chunk no matter the file size.
+
+    Unlike passing the URL to Telegram, this works for URLs that need headers
+    (source_headers), hosts Telegram can't reach and files over its URL limits.
+    Like any other send it follows chat migrations and is retried through
+    with_retry; since the body can't be replayed, a retry downloads it again.
+    """
+    endpoint = f"send{kind.title().replace('_', '')}"
+    fields["chat_id"] = bot.resolve_chat_id(fields.get("chat_id"))
+
+    def migrate(new_chat_id: int):
+        bot.remember_migration(fields["chat_id"], new_chat_id)
+        fields["chat_id"] = new_chat_id
+
+    # Keep the chat's turn for the whole upload, like the sends in PooledBot._do_post
+    async with bot.in_use(), bot.hold_chat(fields["chat_id"]):
+        result = await with_retry(
+            lambda: _upload(bot, endpoint, kind, url, source_headers, filename, fields),
+            on_migrate=migrate,
+            description=endpoint
+        )
+    return Message.de_json(result, bot)
+
+
+async def _upload(bot, endpoint: str, kind: str, url: str, source_headers: Optional[Dict[str, str]],
+                  filename: Optional[str], fields: Dict[str, Any]) -> Dict[str, Any]:
+    """One upload attempt; returns the Bot API result"""
+    budget = remaining_budget()
+    timeout = max(budget, 1.0) if budget is not None else UPLOAD_TIMEOUT
+
+    # The bot owns the source client, so it is closed with the bot and bound to its loop
+    async with bot.source_client.stream("GET", url, headers=source_headers or None) as source:
+        source.raise_for_status()
+
+        filename = filename or _source_filename(source, url)
+        content_type = (
+            source.headers.get("Content-Type", "").split(";")[0].strip()
+            or mimetypes.guess_type(filename)[0]
+            or "application/octet-stream"
+        )
+        boundary = uuid.uuid4().hex
+        head, tail = _multipart_parts(fields, kind, filename, content_type, boundary)
+
+        async def body() -> AsyncIterator[bytes]:
+            yield head
+            async for chunk in source.aiter_bytes(PROXY_CHUNK_SIZE):
+                yield chunk
+            yield tail
+
+        headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        source_length = source.headers.get("Content-Length")
+        if source_length and source_length.isdigit() and "Content-Encoding" not in source.headers:
+            # Known size: send a Content-Length instead of chunked encoding
+            headers["Content-Length"] = str(len(head) + int(source_length) + len(tail))
+
+        await bot.rate_limiter.acquire(endpoint, fields["chat_id"])
+        try:
+            # Upload over the bot's own keep-alive connections
+            response = await bot.http_client.post(
+                f"{bot.base_url}/{endpoint}",
+                content=body(),
+                headers=headers,
+                timeout=httpx.Timeout(timeout, connect=SOURCE_CONNECT_TIMEOUT)
+            )
+        except httpx.TransportError as e:
+            # Let with_retry treat it like any other network error
+            raise NetworkError(f"{type(e).__name__}: {str(e)}") from e
+
+    return _raise_for_response(response)
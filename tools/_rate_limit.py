@@ -0,0 +1,212 @@
+"""
+Telegram-aware token bucket rate limiting for outgoing Bot API calls
+"""
+from telegram.error import RetryAfter
+from tools._retry import DEADLINE_MARGIN, remaining_budget
+from tools._scheduler import FairScheduler, PRIORITY_WEIGHTS, send_priority
+from typing import Any, Dict, Optional, Union
+import asyncio
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# https://core.telegram.org/bots/faq#my-bot-is-hitting-limits-how-do-i-avoid-this
+GLOBAL_RATE = 30.0  # messages per second per bot
+PRIVATE_CHAT_RATE = 1.0  # messages per second per private chat
+GROUP_CHAT_RATE = 20.0 / 60.0  # messages per second per group or channel
+GROUP_CHAT_BURST = 20
+
+# Drop idle per-chat buckets once this many are tracked
+MAX_TRACKED_CHATS = 10000
+# Waits longer than this are logged
+SLOW_WAIT_THRESHOLD = 1.0
+
+# Endpoints that post a message into a chat and count towards the limits
+RATE_LIMITED_ENDPOINTS = frozenset({
+    "sendMessage", "forwardMessage", "forwardMessages", "copyMessage", "copyMessages",
+    "sendPhoto", "sendAudio", "sendDocument", "sendVideo", "sendAnimation", "sendVoice",
+    "sendVideoNote", "sendPaidMedia", "sendMediaGroup", "sendLocation", "sendVenue",
+    "sendContact", "sendPoll", "sendDice", "sendSticker", "sendInvoice", "sendGame",
+})
+# Endpoints that post one message per item of a list parameter; Telegram counts each
+MULTI_MESSAGE_PARAMS = {"sendMediaGroup": "media", "forwardMessages": "message_ids", "copyMessages": "message_ids"}
+
+
+def message_count(endpoint: str, data: Dict[str, Any]) -> int:
+    """Number of messages a call to endpoint with data posts, i.e. the tokens it costs"""
+    items = data.get(MULTI_MESSAGE_PARAMS[endpoint]) if endpoint in MULTI_MESSAGE_PARAMS else None
+    return max(1, len(items)) if isinstance(items, (list, tuple)) else 1
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of rejecting callers.
+
+    The balance may go negative: each reservation returns how long the caller has
+    to wait for its token, so concurrent callers queue up in arrival order.
+    """
+
+    __slots__ = ("rate", "capacity", "_tokens", "_updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: int = 1) -> float:
+        """Take tokens and return the number of seconds until they are usable"""
+        self._refill(time.monotonic())
+        self._tokens -= tokens
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def try_take(self, tokens: int = 1) -> bool:
+        """Take tokens only if they are usable right away"""
+        self._refill(time.monotonic())
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """Seconds until at least one token is available, without taking any"""
+        self._refill(time.monotonic())
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def refund(self, tokens: int = 1) -> None:
+        """Return tokens that were reserved but not used"""
+        self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def is_idle(self) -> bool:
+        """True when the bucket is full again, i.e. dropping it loses no state"""
+        self._refill(time.monotonic())
+        return self._tokens >= self.capacity
+
+
+def is_private_chat(chat_id: Union[int, str, None]) -> bool:
+    """Private chats have positive ids; groups, supergroups and channels negative ones"""
+    try:
+        return int(chat_id) > 0
+    except (TypeError, ValueError):
+        # @username targets are public channels or supergroups
+        return False
+
+
+class RateLimiter:
+    """
+    Paces one bot's sends to Telegram's global and per-chat limits.
+
+    Must only be used from the event loop thread. Calls are delayed, and queue
+    depth and wait times are tracked for stats(); a call is only rejected, with
+    RetryAfter, when its chat's wait would overrun the request deadline. Per-chat
+    limits are served in arrival order; the global limit is shared between
+    chats and priority classes (send_priority) by weighted fair queuing. Calls
+    posting several messages take one token per message from both.
+    """
+
+    def __init__(self, global_rate: float = GLOBAL_RATE,
+                 private_rate: float = PRIVATE_CHAT_RATE,
+                 group_rate: float = GROUP_CHAT_RATE,
+                 group_burst: int = GROUP_CHAT_BURST):
+        self.private_rate = private_rate
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self._global = TokenBucket(global_rate, global_rate)
+        self._scheduler = FairScheduler(self._global)
+        self._chats: Dict[str, TokenBucket] = {}
+
+        self.queued = 0
+        self.max_queued = 0
+        self.total_calls = 0
+        self.delayed_calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        # priority class -> [calls, total wait, max wait]
+        self._by_priority: Dict[str, list] = {priority: [0, 0.0, 0.0] for priority in PRIORITY_WEIGHTS}
+
+    def _chat_bucket(self, chat_id: Union[int, str]) -> TokenBucket:
+        key = str(chat_id)
+        bucket = self._chats.get(key)
+        if bucket is None:
+            if len(self._chats) >= MAX_TRACKED_CHATS:
+                self._prune()
+            if is_private_chat(chat_id):
+                bucket = TokenBucket(self.private_rate, 1)
+            else:
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            self._chats[key] = bucket
+        return bucket
+
+    def _prune(self) -> None:
+        for key in [key for key, bucket in self._chats.items() if bucket.is_idle()]:
+            del self._chats[key]
+
+    async def acquire(self, endpoint: str, chat_id: Optional[Union[int, str]] = None, tokens: int = 1) -> float:
+        """
+        Wait until a call to endpoint for chat_id, posting tokens messages, may be
+        sent; returns the time waited. Raises RetryAfter if the chat's limit would
+        keep it waiting past the request deadline
+        """
+        if endpoint not in RATE_LIMITED_ENDPOINTS:
+            return 0.0
+
+        priority = send_priority.get()
+        started = time.monotonic()
+        self.total_calls += 1
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            # Wait for the chat first so a busy chat doesn't hold global tokens
+            if chat_id is not None:
+                bucket = self._chat_bucket(chat_id)
+                delay = bucket.reserve(tokens)
+                budget = remaining_budget()
+                if delay and budget is not None and delay + DEADLINE_MARGIN > budget:
+                    bucket.refund(tokens)
+                    raise RetryAfter(math.ceil(delay))
+                if delay:
+                    await asyncio.sleep(delay)
+            await self._scheduler.acquire(priority, chat_id, tokens)
+        finally:
+            self.queued -= 1
+
+        waited = time.monotonic() - started
+        totals = self._by_priority.setdefault(priority, [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += waited
+        totals[2] = max(totals[2], waited)
+        if waited > 0.001:
+            self.delayed_calls += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            if waited > SLOW_WAIT_THRESHOLD:
+                logger.info(f"Rate limiter delayed {endpoint} to chat {chat_id} by {waited:.2f}s")
+        return waited
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth and wait times"""
+        return {
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queued,
+            "total_calls": self.total_calls,
+            "delayed_calls": self.delayed_calls,
+            "total_wait_seconds": round(self.total_wait, 3),
+            "average_wait_seconds": round(self.total_wait / self.delayed_calls, 3) if self.delayed_calls else 0.0,
+            "max_wait_seconds": round(self.max_wait, 3),
+            "tracked_chats": len(self._chats),
+            "by_priority": {
+                priority: {
+                    "calls": calls,
+                    "average_wait_seconds": round(total / calls, 3) if calls else 0.0,
+                    "max_wait_seconds": round(longest, 3)
+                }
+                # Copied first: stats() is read from tool threads while the loop records calls
+                for priority, (calls, total, longest) in list(self._by_priority.items())
+            }
+        }
@@ -0,0 +1,101 @@
+"""
+Retry engine for Bot API calls: flood waits, network errors and chat migrations
+"""
+from telegram.error import BadRequest, ChatMigrated, NetworkError, RetryAfter
+from contextvars import ContextVar
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional, TypeVar
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAX_FLOOD_RETRIES = 5
+MAX_NETWORK_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+# Extra delay on top of Telegram's retry_after, the counter is second-granular
+RETRY_AFTER_PADDING = 0.25
+# Give up when a retry would leave less than this much of the request budget
+DEADLINE_MARGIN = 1.0
+
+# Monotonic timestamp by which the current tool invocation must finish
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+async def with_deadline(coro: Awaitable[T], timeout: Optional[float]) -> T:
+    """Await coro with request_deadline set, so retries know the remaining budget"""
+    if timeout is not None:
+        request_deadline.set(time.monotonic() + timeout)
+    return await coro
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left before the current request deadline, None if unbounded"""
+    deadline = request_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with equal jitter"""
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _fits_budget(delay: float) -> bool:
+    remaining = remaining_budget()
+    return remaining is None or delay + DEADLINE_MARGIN < remaining
+
+
+async def with_retry(call: Callable[[], Awaitable[T]],
+                     on_migrate: Optional[Callable[[int], None]] = None,
+                     description: str = "Telegram call") -> T:
+    """
+    Await call(), retrying on recoverable Telegram errors:
+    - RetryAfter: wait the flood-control delay Telegram asked for
+    - NetworkError/TimedOut (but not BadRequest): exponential backoff with jitter
+    - ChatMigrated: report the new chat id through on_migrate and retry once
+    Gives up and re-raises when retries run out or the next wait would not
+    fit into the remaining request budget.
+    """
+    flood_retries = 0
+    network_retries = 0
+    migrated = False
+
+    while True:
+        try:
+            return await call()
+        except RetryAfter as e:
+            delay = retry_after_seconds(e) + RETRY_AFTER_PADDING
+            if flood_retries >= MAX_FLOOD_RETRIES or not _fits_budget(delay):
+                raise
+            flood_retries += 1
+            logger.warning(f"{description}: flood control, retrying in {delay:.2f}s")
+        except ChatMigrated as e:
+            if on_migrate is None or migrated:
+                raise
+            migrated = True
+            on_migrate(e.new_chat_id)
+            logger.info(f"{description}: chat migrated to {e.new_chat_id}, retrying")
+            continue
+        except BadRequest:
+            raise
+        except NetworkError as e:
+            delay = backoff_delay(network_retries)
+            if network_retries >= MAX_NETWORK_RETRIES or not _fits_budget(delay):
+                raise
+            network_retries += 1
+            logger.warning(f"{description}: {type(e).__name__} ({str(e)}), retrying in {delay:.2f}s")
+
+        await asyncio.sleep(delay)
@@ -0,0 +1,130 @@
+"""
+Priority classes and weighted fair queuing for outgoing sends
+"""
+from contextvars import ContextVar
+from typing import Awaitable, Dict, List, Optional, Tuple, TypeVar, Union
+import asyncio
+import heapq
+import itertools
+
+T = TypeVar("T")
+
+# Someone is waiting on the result: callback answers, replies, live edits
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+# Fan-out jobs: broadcasts, bulk forwards and copies
+BULK = "bulk"
+
+# Share of the send rate each class gets while others are queued
+PRIORITY_WEIGHTS: Dict[str, float] = {INTERACTIVE: 16.0, NORMAL: 4.0, BULK: 1.0}
+
+# Priority class of the sends made by the current tool invocation
+send_priority: ContextVar[str] = ContextVar("send_priority", default=NORMAL)
+
+
+async def with_priority(coro: Awaitable[T], priority: str) -> T:
+    """
+    Await coro with send_priority set; tasks it starts inherit the class.
+    Priority only orders sends waiting for the rate limiter: per-chat ordering
+    comes first, so an interactive reply still waits for a send to the same
+    chat that is already in progress, such as a large proxied upload
+    """
+    if priority not in PRIORITY_WEIGHTS:
+        raise ValueError(f"unknown priority {priority!r}")
+    send_priority.set(priority)
+    return await coro
+
+
+class FairScheduler:
+    """
+    Hands out a token bucket's tokens by weighted fair queuing, at two levels.
+
+    Between priority classes, each send goes to the queued class with the
+    earliest virtual finish time, which advances by tokens/weight per send
+    served, so a waiting interactive send is served ahead of a bulk backlog
+    while bulk still gets its share. Within a class every chat is a flow stamped
+    tokens steps after its own previous send, so no chat can crowd out the others.
+
+    Must only be used from the event loop thread.
+    """
+
+    def __init__(self, bucket, weights: Optional[Dict[str, float]] = None):
+        self.bucket = bucket
+        self.weights = weights or PRIORITY_WEIGHTS
+        # priority class -> heap of (flow finish time, arrival, waiter, tokens)
+        self._queues: Dict[str, List[Tuple[float, int, asyncio.Future, int]]] = {}
+        self._class_finish: Dict[str, float] = {}
+        self._class_virtual: Dict[str, float] = {}
+        self._flow_finish: Dict[Tuple[str, str], float] = {}
+        self._virtual = 0.0
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self, priority: str, chat_id: Optional[Union[int, str]] = None, tokens: int = 1) -> None:
+        """Wait for tokens, served in fair order among everyone waiting"""
+        if not any(self._queues.values()) and self.bucket.try_take(tokens):
+            return
+
+        queue = self._queues.setdefault(priority, [])
+        while queue and queue[0][2].done():
+            heapq.heappop(queue)
+        if not queue:
+            # A class becoming backlogged starts from now; while it stays backlogged
+            # its own finish time carries on, so the others can't starve it
+            self._class_finish[priority] = max(self._virtual, self._class_finish.get(priority, 0.0))
+
+        flow = (priority, str(chat_id))
+        finish = max(self._class_virtual.get(priority, 0.0), self._flow_finish.get(flow, 0.0)) + tokens
+        self._flow_finish[flow] = finish
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(queue, (finish, next(self._sequence), future, tokens))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+        # A cancelled waiter stays queued; the dispatcher skips it
+        await future
+
+    def _next_waiter(self) -> Optional[Tuple[asyncio.Future, int]]:
+        best = None
+        for priority, queue in self._queues.items():
+            while queue and queue[0][2].done():
+                heapq.heappop(queue)
+            if queue:
+                finish = self._class_finish[priority] + queue[0][3] / self.weights.get(priority, 1.0)
+                if best is None or finish < best[0]:
+                    best = (finish, priority)
+        if best is None:
+            return None
+
+        finish, priority = best
+        flow_finish, _, future, tokens = heapq.heappop(self._queues[priority])
+        self._virtual = self._class_finish[priority] = finish
+        self._class_virtual[priority] = flow_finish
+        return future, tokens
+
+    async def _dispatch(self) -> None:
+        while any(self._queues.values()):
+            delay = self.bucket.wait_time()
+            if delay:
+                await asyncio.sleep(delay)
+            # Pick the waiter only once a token is usable, so late
+            # high-priority arrivals still go first
+            waiter = self._next_waiter()
+            if waiter is None:
+                continue
+            future, tokens = waiter
+            # A send posting several messages waits until the bucket covers all of them
+            delay = self.bucket.reserve(tokens)
+            if delay:
+                await asyncio.sleep(delay)
+            if future.done():
+                self.bucket.refund(tokens)
+            else:
+                future.set_result(None)
+        # Every flow is idle again; their history no longer matters
+        self._class_finish.clear()
+        self._class_virtual.clear()
+        self._flow_finish.clear()
+        self._virtual = 0.0
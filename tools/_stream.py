@@ -0,0 +1,242 @@
+"""
+Streamed messages: text that grows over several tool calls, shown by editing
+a Telegram message in place and rolling over to new messages at the limit
+"""
+from telegram.error import BadRequest
+from tools._rate_limit import is_private_chat
+from tools._retry import request_deadline
+from tools._text_split import split_text_with_offsets
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Telegram allows roughly one edit per second in private chats and 20 per
+# minute in groups, so edits are coalesced to at most one per interval
+PRIVATE_EDIT_INTERVAL = 1.0
+GROUP_EDIT_INTERVAL = 3.0
+MIN_EDIT_INTERVAL = 0.3
+PLACEHOLDER_TEXT = "…"
+# Streams without updates for this long are flushed and forgotten
+STREAM_IDLE_TIMEOUT = 600
+
+
+class MessageStream:
+    """
+    Accumulates text and mirrors it into one or more messages of a chat.
+
+    Only used from the event loop thread. Updates only schedule a flush; at
+    most one edit per interval is sent, always with the latest text.
+    """
+
+    def __init__(self, bot, chat_id, parse_mode: Optional[str] = None,
+                 interval: Optional[float] = None, disable_notification: bool = False):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.parse_mode = parse_mode
+        if interval is None:
+            interval = PRIVATE_EDIT_INTERVAL if is_private_chat(chat_id) else GROUP_EDIT_INTERVAL
+        self.interval = max(interval, MIN_EDIT_INTERVAL)
+        self.disable_notification = disable_notification
+
+        self.text = ""
+        self.message_ids: List[int] = []
+        # Text before committed went into messages that are complete; carry
+        # is the markup that reopens formatting still open at that point
+        self._committed = 0
+        self._carry = ""
+        self._rendered = ""
+        self._dirty = False
+        self._last_flush = 0.0
+        self._task: Optional[asyncio.Task] = None
+        # True while the scheduled task is sending, when cancelling it could lose a message it posted
+        self._flushing = False
+        self._closed = False
+        self._lock = asyncio.Lock()
+        self._started = asyncio.get_running_loop().create_future()
+        self.updated = time.monotonic()
+        self.error: Optional[Exception] = None
+
+    async def start(self) -> None:
+        """Post the placeholder message that the first flush will edit"""
+        try:
+            message = await self.bot.send_message(
+                chat_id=self.chat_id,
+                text=PLACEHOLDER_TEXT,
+                disable_notification=self.disable_notification
+            )
+        except BaseException as e:
+            self._started.set_exception(e)
+            # Callers that joined the stream see it through wait_started()
+            self._started.exception()
+            raise
+        self.message_ids.append(message.message_id)
+        self._rendered = PLACEHOLDER_TEXT
+        self._started.set_result(None)
+
+    async def wait_started(self) -> None:
+        """Wait until start() posted the placeholder; raises the error if it failed"""
+        await asyncio.shield(self._started)
+
+    def update(self, text: str, replace: bool = False) -> None:
+        """Append text (or replace everything) and schedule a debounced flush"""
+        if replace:
+            if not text.startswith(self.text[:self._committed]):
+                raise ValueError("replacement text must keep the part already sent in earlier messages")
+            self.text = text
+        else:
+            self.text += text
+        self.updated = time.monotonic()
+        self._dirty = True
+        if not self._closed and (self._task is None or self._task.done()):
+            delay = max(0.0, self._last_flush + self.interval - time.monotonic())
+            self._task = asyncio.get_running_loop().create_task(self._flush_later(delay))
+
+    async def _flush_later(self, delay: float) -> None:
+        # Background work must not inherit the deadline of the call that scheduled it
+        request_deadline.set(None)
+        await asyncio.sleep(delay)
+        self._flushing = True
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error updating streamed message in chat {self.chat_id}: {str(e)}")
+            self.error = e
+        finally:
+            self._flushing = False
+        if self._dirty and not self._closed:
+            self._task = asyncio.get_running_loop().create_task(self._flush_later(self.interval))
+
+    async def flush(self) -> None:
+        """Render the current text now: seal full messages, edit the live one"""
+        async with self._lock:
+            self._dirty = False
+            source = self._carry + self.text[self._committed:]
+            if not source.strip():
+                return
+            parts = split_text_with_offsets(source, self.parse_mode)
+
+            for index, (part, end, reopen) in enumerate(parts):
+                if index > 0:
+                    message = await self.bot.send_message(
+                        chat_id=self.chat_id,
+                        text=part,
+                        parse_mode=self.parse_mode,
+                        disable_notification=True
+                    )
+                    self.message_ids.append(message.message_id)
+                    self._rendered = part
+                else:
+                    await self._edit(part)
+
+                if index < len(parts) - 1:
+                    # This message is full; later flushes start after it
+                    self._committed += max(0, end - len(self._carry))
+                    self._carry = reopen
+            self._last_flush = time.monotonic()
+
+    async def _edit(self, text: str) -> None:
+        if text == self._rendered:
+            return
+        try:
+            await self.bot.edit_message_text(
+                chat_id=self.chat_id,
+                message_id=self.message_ids[-1],
+                text=text,
+                parse_mode=self.parse_mode
+            )
+        except BadRequest as e:
+            description = str(e).lower()
+            if "not modified" in description:
+                pass
+            elif self.parse_mode and "parse entities" in description:
+                # Half-written markup; show it as plain text until it's complete
+                await self.bot.edit_message_text(
+                    chat_id=self.chat_id, message_id=self.message_ids[-1], text=text
+                )
+            else:
+                raise
+        self._rendered = text
+
+    async def close(self) -> None:
+        """
+        Render the final text. A scheduled flush still waiting is cancelled; one
+        already sending is waited for, since cancelling it after Telegram posted
+        a rollover message would make the final flush post it again
+        """
+        self._closed = True
+        task = self._task
+        if task is not None and not task.done():
+            if not self._flushing:
+                task.cancel()
+            await asyncio.wait([task])
+        await self.flush()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "chat_id": self.chat_id,
+            "message_ids": list(self.message_ids),
+            "length": len(self.text),
+            "pending": self._dirty
+        }
+
+
+# (bot key, stream id) -> stream; only touched from the event loop thread
+_streams: Dict[Tuple[str, str], MessageStream] = {}
+
+
+async def _expire_idle_streams() -> None:
+    now = time.monotonic()
+    for key, stream in list(_streams.items()):
+        if now - stream.updated > STREAM_IDLE_TIMEOUT:
+            del _streams[key]
+            try:
+                await stream.close()
+            except Exception as e:
+                logger.warning(f"Failed to finish idle stream {key[1]}: {str(e)}")
+
+
+async def update_stream(bot, stream_id: str, chat_id, text: str = "", replace: bool = False,
+                        final: bool = False, parse_mode: Optional[str] = None,
+                        interval: Optional[float] = None,
+                        disable_notification: bool = False) -> Tuple[MessageStream, bool]:
+    """
+    Feed text into the stream with this id, starting it on first use.
+    Returns the stream and whether it was newly started. With final=True the
+    text is rendered before returning and the stream is closed.
+    """
+    await _expire_idle_streams()
+
+    key = (bot.key, stream_id)
+    stream = _streams.get(key)
+    created = stream is None
+    if created:
+        stream = MessageStream(bot, chat_id, parse_mode, interval, disable_notification)
+        # Register before the first await, so a concurrent first call joins
+        # this stream instead of posting a second placeholder
+        _streams[key] = stream
+        try:
+            await stream.start()
+        except Exception:
+            if _streams.get(key) is stream:
+                del _streams[key]
+            raise
+    else:
+        await stream.wait_started()
+
+    if stream.error is not None:
+        error, stream.error = stream.error, None
+        if final and _streams.get(key) is stream:
+            del _streams[key]
+        raise error
+
+    if text or replace:
+        stream.update(text, replace=replace)
+
+    if final:
+        if _streams.get(key) is stream:
+            del _streams[key]
+        await stream.close()
+    return stream, created
@@ -0,0 +1,255 @@
+"""
+Split long message text into Telegram-sized parts with balanced formatting
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import re
+
+# Telegram's limit for message text, in UTF-16 code units
+MAX_MESSAGE_LENGTH = 4096
+# Prefer a natural break point in the back half of a part over a worse one further on
+MIN_FILL_RATIO = 0.5
+
+# Break point priorities, best first
+PARAGRAPH, LINE, SENTENCE, WORD, ANYWHERE = 4, 3, 2, 1, 0
+
+_SENTENCE_END = ".!?…。！？"
+_HTML_TOKEN = re.compile(r'<(/?)([a-zA-Z][\w-]*)([^>]*)>|&#?\w+;')
+_MD_LINK = re.compile(r'!?\[(?:\\.|[^\]\\])*\]\((?:\\.|[^)\\])*\)')
+_MDV2_MARKERS = ("```", "||", "__", "`", "*", "_", "~")
+_MD_MARKERS = ("```", "`", "*", "_")
+
+
+@dataclass
+class _Token:
+    raw: str
+    # "text", "open", "close" or "atom" (never split)
+    kind: str
+    # Identifies the entity for open/close tokens
+    name: str = ""
+
+
+@dataclass
+class _Entity:
+    name: str
+    opener: str
+    closer: str
+
+
+def utf16_length(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _tokenize_html(text: str) -> List[_Token]:
+    tokens = []
+    position = 0
+    for match in _HTML_TOKEN.finditer(text):
+        if match.start() > position:
+            tokens.append(_Token(text[position:match.start()], "text"))
+        if match.group(2) is None:
+            tokens.append(_Token(match.group(0), "atom"))
+        else:
+            kind = "close" if match.group(1) else "open"
+            tokens.append(_Token(match.group(0), kind, match.group(2).lower()))
+        position = match.end()
+    if position < len(text):
+        tokens.append(_Token(text[position:], "text"))
+    return tokens
+
+
+def _tokenize_markdown(text: str, markers: Tuple[str, ...]) -> List[_Token]:
+    tokens = []
+    buffer = []
+    # Markers currently open, innermost last
+    open_markers: List[str] = []
+    position = 0
+
+    def flush():
+        if buffer:
+            tokens.append(_Token("".join(buffer), "text"))
+            buffer.clear()
+
+    while position < len(text):
+        char = text[position]
+        in_code = bool(open_markers) and open_markers[-1] in ("```", "`")
+
+        if char == "\\" and position + 1 < len(text):
+            flush()
+            tokens.append(_Token(text[position:position + 2], "atom"))
+            position += 2
+            continue
+
+        if not in_code and char in "![":
+            link = _MD_LINK.match(text, position)
+            if link:
+                flush()
+                tokens.append(_Token(link.group(0), "atom"))
+                position = link.end()
+                continue
+
+        marker = next((m for m in markers if text.startswith(m, position)), None)
+        if marker and in_code and marker != open_markers[-1]:
+            # Only the matching fence ends a code entity
+            marker = None
+        if marker:
+            flush()
+            if marker in open_markers:
+                while open_markers:
+                    closed = open_markers.pop()
+                    if closed == marker:
+                        break
+                tokens.append(_Token(marker, "close", marker))
+                position += len(marker)
+            elif marker == "```":
+                # Keep the language line with the opening fence so it can be repeated
+                line_end = text.find("\n", position)
+                end = len(text) if line_end == -1 else line_end + 1
+                open_markers.append(marker)
+                tokens.append(_Token(text[position:end], "open", marker))
+                position = end
+            else:
+                open_markers.append(marker)
+                tokens.append(_Token(marker, "open", marker))
+                position += len(marker)
+            continue
+
+        buffer.append(char)
+        position += 1
+
+    flush()
+    return tokens
+
+
+def _tokenize(text: str, parse_mode: Optional[str]) -> List[_Token]:
+    mode = (parse_mode or "").lower()
+    if mode == "html":
+        return _tokenize_html(text)
+    if mode == "markdownv2":
+        return _tokenize_markdown(text, _MDV2_MARKERS)
+    if mode == "markdown":
+        return _tokenize_markdown(text, _MD_MARKERS)
+    return [_Token(text, "text")]
+
+
+def _closer(token: _Token, parse_mode: Optional[str]) -> str:
+    if (parse_mode or "").lower() == "html":
+        return f"</{token.name}>"
+    return token.name
+
+
+def _whitespace_priority(text: str, start: int, end: int, full_text: str, offset: int) -> int:
+    run = text[start:end]
+    if "\n\n" in run:
+        return PARAGRAPH
+    if "\n" in run:
+        return LINE
+    before = full_text[offset + start - 1] if offset + start > 0 else ""
+    if before in _SENTENCE_END:
+        return SENTENCE
+    return WORD
+
+
+def split_text(text: str, parse_mode: Optional[str] = None, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Split text into parts of at most limit UTF-16 code units, preferring to
+    break between paragraphs, then lines, sentences and words, and avoiding
+    breaks inside code blocks. Formatting that spans a break (HTML tags,
+    Markdown/MarkdownV2 entities) is closed at the end of a part and reopened
+    at the start of the next, so every part is valid on its own.
+
+    Lengths are measured on the marked-up text, which is never shorter than
+    what Telegram counts, so parts always fit. Raises ValueError if a single
+    unbreakable piece (e.g. a link) is longer than limit.
+    """
+    return [part for part, _, _ in split_text_with_offsets(text, parse_mode, limit)]
+
+
+def split_text_with_offsets(text: str, parse_mode: Optional[str] = None,
+                            limit: int = MAX_MESSAGE_LENGTH) -> List[Tuple[str, int, str]]:
+    """
+    Like split_text, but returns (part, end, reopen) for every part: end is the
+    offset in text where the next part starts and reopen the markup the next
+    part must start with to restore the formatting open at that point.
+    Entities still open at the end of text are closed in the last part.
+    """
+    if utf16_length(text) <= limit:
+        return [(text, len(text), "")]
+
+    tokens = _tokenize(text, parse_mode)
+
+    # Build the raw text with a list of break candidates:
+    # (cut position, next part start, priority, open entities at that point)
+    raw = "".join(token.raw for token in tokens)
+    candidates: List[Tuple[int, int, int, Tuple[_Entity, ...]]] = []
+    stack: List[_Entity] = []
+    offset = 0
+    for token in tokens:
+        if token.kind == "open":
+            stack.append(_Entity(token.name, token.raw, _closer(token, parse_mode)))
+        elif token.kind == "close":
+            for index in range(len(stack) - 1, -1, -1):
+                if stack[index].name == token.name:
+                    del stack[index:]
+                    break
+        elif token.kind == "text":
+            frozen = tuple(stack)
+            in_code = any(entity.name in ("pre", "code", "```", "`") for entity in stack)
+            penalty = 2 if in_code else 0
+            for index in range(1, len(token.raw)):
+                candidates.append((offset + index, offset + index, ANYWHERE, frozen))
+            for match in re.finditer(r'\s+', token.raw):
+                priority = _whitespace_priority(token.raw, match.start(), match.end(), raw, offset)
+                candidates.append((
+                    offset + match.start(), offset + match.end(), max(priority - penalty, ANYWHERE), frozen
+                ))
+        offset += len(token.raw)
+        candidates.append((offset, offset, ANYWHERE, tuple(stack)))
+    candidates.sort(key=lambda candidate: (candidate[0], -candidate[2]))
+
+    # UTF-16 length of raw[:i]
+    prefix_units = [0]
+    for char in raw:
+        prefix_units.append(prefix_units[-1] + (2 if ord(char) > 0xFFFF else 1))
+
+    parts = []
+    start = 0
+    opened: Tuple[_Entity, ...] = ()
+    first_candidate = 0
+    while start < len(raw):
+        reopen = "".join(entity.opener for entity in opened)
+        reopen_units = utf16_length(reopen)
+        closing_all = "".join(entity.closer for entity in reversed(stack))
+        if reopen_units + prefix_units[-1] - prefix_units[start] + utf16_length(closing_all) <= limit:
+            parts.append((reopen + raw[start:] + closing_all, len(raw), ""))
+            break
+
+        fitting = []
+        index = first_candidate
+        while index < len(candidates):
+            cut, next_start, priority, entities = candidates[index]
+            index += 1
+            if cut <= start:
+                continue
+            body_units = reopen_units + prefix_units[cut] - prefix_units[start]
+            if body_units > limit:
+                break
+            closing = "".join(entity.closer for entity in reversed(entities))
+            if body_units + utf16_length(closing) <= limit:
+                fitting.append((priority, cut, next_start, entities, closing, body_units))
+
+        if not fitting:
+            raise ValueError(f"text contains an unbreakable piece longer than {limit} characters")
+
+        filled = [candidate for candidate in fitting if candidate[5] >= limit * MIN_FILL_RATIO] or fitting
+        best = max(filled, key=lambda candidate: (candidate[0], candidate[1]))
+        _, cut, next_start, entities, closing, _ = best
+
+        if raw[start:cut].strip():
+            parts.append((reopen + raw[start:cut] + closing, next_start,
+                          "".join(entity.opener for entity in entities)))
+        start = next_start
+        opened = entities
+        while first_candidate < len(candidates) and candidates[first_candidate][0] <= start:
+            first_candidate += 1
+
+    return parts
@@ -0,0 +1,204 @@
+"""
+Update ingestion: getUpdates with a persisted offset, compact update parsing
+and duplicate detection for webhook deliveries
+"""
+from collections import deque
+from tools._retry import remaining_budget
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Telegram caps getUpdates at 100 updates per call and 50 seconds of long polling
+MAX_UPDATES_PER_BATCH = 100
+MAX_POLL_TIMEOUT = 50
+# Where the next offset of every bot is kept; set to an empty value to keep offsets in memory only
+UPDATE_OFFSET_PATH = os.environ.get(
+    "TELEGRAM_UPDATE_OFFSET_PATH", os.path.join(tempfile.gettempdir(), "telegram-update-offsets.json")
+)
+# Stop draining when less than this much of the request budget is left
+POLL_BUDGET_MARGIN = 5.0
+# Recent update_ids remembered to drop redelivered webhook updates
+RECENT_UPDATES_SIZE = 4096
+
+# Update payloads that are messages themselves
+_MESSAGE_TYPES = frozenset({
+    "message", "edited_message", "channel_post", "edited_channel_post",
+    "business_message", "edited_business_message"
+})
+# Message fields reported as the media kind, in order of precedence
+_MEDIA_FIELDS = (
+    "photo", "video", "animation", "document", "audio", "voice", "video_note", "sticker",
+    "location", "venue", "contact", "poll", "dice"
+)
+
+
+class UpdateOffsetStore:
+    """
+    Next getUpdates offset per bot, persisted to a small JSON file (written
+    atomically on every change) so a restart doesn't replay confirmed updates
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or None
+        self._offsets: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if self.path:
+            self._load()
+
+    def get(self, bot_key: str) -> Optional[int]:
+        return self._offsets.get(bot_key)
+
+    def set(self, bot_key: str, offset: int) -> None:
+        with self._lock:
+            if self._offsets.get(bot_key) == offset:
+                return
+            self._offsets[bot_key] = offset
+            snapshot = dict(self._offsets)
+        self._save(snapshot)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._offsets = {key: int(offset) for key, offset in json.load(f).items()}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable update offsets {self.path}: {str(e)}")
+
+    def _save(self, snapshot: Dict[str, int]) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Failed to persist update offsets: {str(e)}")
+
+
+update_offsets = UpdateOffsetStore(UPDATE_OFFSET_PATH)
+
+
+class RecentUpdateIds:
+    """
+    Ring buffer of the last max_entries update_ids, with a set for O(1)
+    lookups. Telegram redelivers an update when it doesn't get a timely 2xx,
+    so a retried update must be recognized and dropped
+    """
+
+    def __init__(self, max_entries: int = RECENT_UPDATES_SIZE):
+        self._ring: Deque[int] = deque(maxlen=max_entries)
+        self._seen: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def add(self, update_id: int) -> bool:
+        """Remember update_id; returns False if it was already seen"""
+        with self._lock:
+            if update_id in self._seen:
+                return False
+            if len(self._ring) == self._ring.maxlen:
+                self._seen.discard(self._ring[0])
+            self._ring.append(update_id)
+            self._seen.add(update_id)
+            return True
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+# Bot key -> lock; Telegram rejects overlapping getUpdates calls with a Conflict error.
+# Only touched from the event loop thread
+_poll_locks: Dict[str, asyncio.Lock] = {}
+
+
+def update_type(update: Dict[str, Any]) -> Optional[str]:
+    """The kind of update, i.e. its only field besides update_id"""
+    return next((key for key in update if key != "update_id"), None)
+
+
+def compact_update(update: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a raw update to the fields a workflow usually routes on: who, where,
+    what text or data. Fields that don't apply to the update type are left out
+    """
+    kind = update_type(update)
+    payload = update.get(kind) or {}
+    message = payload if kind in _MESSAGE_TYPES else payload.get("message") or {}
+    chat = payload.get("chat") or message.get("chat") or {}
+    user = payload.get("from") or payload.get("user") or message.get("from") or {}
+
+    compact = {
+        "update_id": update.get("update_id"),
+        "type": kind,
+        "id": payload.get("id") if kind not in _MESSAGE_TYPES else None,
+        "chat_id": chat.get("id"),
+        "chat_type": chat.get("type"),
+        "user_id": user.get("id"),
+        "username": user.get("username"),
+        "message_id": message.get("message_id") or payload.get("message_id"),
+        "date": payload.get("date") or message.get("date"),
+        "text": message.get("text") or message.get("caption") if kind in _MESSAGE_TYPES else None,
+        "media": next((field for field in _MEDIA_FIELDS if field in message), None)
+        if kind in _MESSAGE_TYPES else None,
+        "data": payload.get("data"),
+        "query": payload.get("query"),
+        "status": (payload.get("new_chat_member") or {}).get("status"),
+    }
+    return {key: value for key, value in compact.items() if value is not None}
+
+
+async def poll_updates(bot, timeout: int = 0, limit: int = MAX_UPDATES_PER_BATCH,
+                       allowed_updates: Optional[List[str]] = None, max_batches: int = 1,
+                       offset: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int], int, bool]:
+    """
+    Fetch up to max_batches batches of updates starting at the bot's saved
+    offset (or the given one). Only the first batch long-polls for timeout
+    seconds; later ones return immediately, so draining stops as soon as the
+    backlog is empty.
+
+    The next offset is not saved here: the caller saves it with update_offsets
+    once the updates are handed over, so updates fetched by a call that times
+    out are delivered again. Fetching a later batch confirms the earlier ones
+    to Telegram, so if a later batch fails the batches already fetched are
+    returned rather than dropped.
+
+    Returns (raw updates, next offset, batches fetched, whether the backlog was drained).
+    """
+    lock = _poll_locks.setdefault(bot.key, asyncio.Lock())
+    async with lock:
+        if offset is None:
+            offset = update_offsets.get(bot.key)
+        updates: List[Dict[str, Any]] = []
+        batches = 0
+        drained = False
+
+        while batches < max_batches:
+            wait = timeout if batches == 0 else 0
+            budget = remaining_budget()
+            if budget is not None:
+                if batches and budget < POLL_BUDGET_MARGIN:
+                    break
+                wait = max(0, min(wait, int(budget - POLL_BUDGET_MARGIN)))
+
+            try:
+                batch = await bot.get_raw_updates(offset, limit, wait, allowed_updates)
+            except Exception as e:
+                if not updates:
+                    raise
+                logger.warning(f"Stopped draining updates after {batches} batch(es): {str(e)}")
+                break
+            batches += 1
+            if batch:
+                offset = batch[-1]["update_id"] + 1
+                updates.extend(batch)
+            if len(batch) < limit:
+                drained = True
+                break
+
+        return updates, offset, batches, drained
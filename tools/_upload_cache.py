@@ -0,0 +1,180 @@
+"""
+Content-hash -> file_id cache so repeated media sends reuse Telegram's copy
+"""
+from collections import OrderedDict
+from tools._cache import TTLCache
+from typing import Dict, Optional, Tuple
+import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+FILE_ID_CACHE_SIZE = 4096
+# Set to a file path to keep the cache across plugin restarts
+FILE_ID_CACHE_PATH = os.environ.get("TELEGRAM_FILE_ID_CACHE_PATH")
+# Minimum seconds between writes of the persisted cache
+SAVE_INTERVAL = 5.0
+HASH_CHUNK_SIZE = 1024 * 1024
+# Set to 0 to send URLs as they are, without the HEAD request that keys them
+URL_CACHE_ENABLED = os.environ.get("TELEGRAM_CACHE_URL_MEDIA", "1").lower() not in ("0", "false", "no")
+URL_PROBE_TIMEOUT = 5.0
+# URLs without a validator (or that couldn't be probed) aren't probed again for this long
+UNCACHEABLE_URL_TTL = 3600
+
+
+class FileIdCache:
+    """
+    Bounded LRU mapping of cache keys to Telegram file_ids, optionally persisted
+    to a JSON file (written atomically, at most every SAVE_INTERVAL seconds)
+    """
+
+    def __init__(self, max_entries: int = FILE_ID_CACHE_SIZE, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self._load()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            file_id = self._entries.get(key)
+            if file_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return file_id
+
+    def put(self, key: str, file_id: str) -> None:
+        with self._lock:
+            self._entries[key] = file_id
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+        self._maybe_save()
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            for key, file_id in list(entries.items())[-self.max_entries:]:
+                self._entries[key] = file_id
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable file_id cache {self.path}: {str(e)}")
+
+    def _maybe_save(self) -> None:
+        if self.path and time.monotonic() - self._last_save >= SAVE_INTERVAL:
+            self.save()
+
+    def save(self) -> None:
+        """Write the cache to disk if persistence is enabled and it changed"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self._entries)
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Failed to persist file_id cache: {str(e)}")
+
+
+file_id_cache = FileIdCache(path=FILE_ID_CACHE_PATH)
+atexit.register(file_id_cache.save)
+
+# (path, size, mtime) -> sha256, so unchanged files are hashed only once
+_digests: Dict[Tuple[str, int, int], str] = {}
+# URL -> True for URLs whose content can't be keyed
+_uncacheable_urls = TTLCache(UNCACHEABLE_URL_TTL, FILE_ID_CACHE_SIZE)
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file's content, read in chunks"""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _digests.get(memo_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        if len(_digests) >= FILE_ID_CACHE_SIZE:
+            _digests.clear()
+        _digests[memo_key] = digest
+    return digest
+
+
+async def probe_url(bot, url: str) -> Optional[str]:
+    """
+    Return a validator (ETag or Last-Modified) for the URL's current content,
+    or None when the server offers none and the URL can't be cached safely.
+    Such URLs are remembered, so sending them again doesn't wait on another probe
+    """
+    if _uncacheable_urls.get(url):
+        return None
+    try:
+        response = await bot.http_client.head(url, timeout=URL_PROBE_TIMEOUT, follow_redirects=True)
+        response.raise_for_status()
+        validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+    except Exception as e:
+        logger.debug(f"Could not probe {url}: {str(e)}")
+        validator = None
+    if not validator:
+        _uncacheable_urls.set(url, True)
+    return validator
+
+
+async def media_cache_key(bot, kind: str, media: str) -> Optional[str]:
+    """
+    Cache key for a local file (content hash) or URL (URL + ETag/Last-Modified)
+    file_ids are only valid for the bot that uploaded them, so the key includes
+    the bot. Returns None for anything that can't be cached (e.g. a file_id)
+    """
+    if os.path.isfile(media):
+        content_key = "sha256:" + await asyncio.get_running_loop().run_in_executor(None, hash_file, media)
+    elif URL_CACHE_ENABLED and media.startswith(('http://', 'https://')):
+        validator = await probe_url(bot, media)
+        if not validator:
+            return None
+        content_key = f"url:{media}#{validator}"
+    else:
+        return None
+    return f"{bot.key}:{kind}:{content_key}"
+
+
+def extract_file_id(message, kind: str) -> Optional[str]:
+    """file_id of the media of the given kind in a sent message"""
+    if kind == "photo":
+        return message.photo[-1].file_id if message.photo else None
+    media = getattr(message, kind, None)
+    return media.file_id if media else None
@@ -3,10 +3,15 @@ from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
 from tools._helpers import get_bot, run_async
+from tools._scheduler import INTERACTIVE
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Telegram stops accepting answers to a callback query after about 15 seconds
+CALLBACK_ANSWER_TIMEOUT = 15
+
 
 class AnswerCallbackQueryTool(Tool):
     def _invoke(
@@ -15,6 +20,7 @@ class AnswerCallbackQueryTool(Tool):
         """
         Answer a callback query from an inline keyboard button
         """
+        started = time.perf_counter()
         try:
             # Get parameters
             callback_query_id = tool_parameters.get("callback_query_id")
@@ -31,8 +37,10 @@ class AnswerCallbackQueryTool(Tool):
             # Get bot instance
             bot = get_bot(self.runtime.credentials)
 
-            # Answer callback query
+            # Answer callback query; answerCallbackQuery skips the rate limiter and
+            # goes over the bot's priority connections, so bulk sends don't delay it
             async def answer():
+                api_started = time.perf_counter()
                 result = await bot.answer_callback_query(
                     callback_query_id=callback_query_id,
                     text=text,
@@ -40,15 +48,20 @@ class AnswerCallbackQueryTool(Tool):
                     url=url,
                     cache_time=cache_time
                 )
-                return result
+                return result, time.perf_counter() - api_started
 
-            result = run_async(answer())
+            result, api_latency = run_async(
+                answer(), timeout=CALLBACK_ANSWER_TIMEOUT, priority=INTERACTIVE
+            )
+            latency_ms = round((time.perf_counter() - started) * 1000, 1)
+            api_latency_ms = round(api_latency * 1000, 1)
 
             if result:
                 yield self.create_text_message(
                     f"✅ Callback query answered successfully!\n"
                     f"Query ID: {callback_query_id}\n"
-                    f"Alert Mode: {'Yes' if show_alert else 'No'}"
+                    f"Alert Mode: {'Yes' if show_alert else 'No'}\n"
+                    f"Latency: {latency_ms} ms (API {api_latency_ms} ms)"
                 )
 
                 yield self.create_json_message({
@@ -56,7 +69,9 @@ class AnswerCallbackQueryTool(Tool):
                     "callback_query_id": callback_query_id,
                     "text": text,
                     "show_alert": show_alert,
-                    "url": url
+                    "url": url,
+                    "latency_ms": latency_ms,
+                    "api_latency_ms": api_latency_ms
                 })
             else:
                 yield self.create_text_message("❌ Failed to answer callback query")
@@ -3,18 +3,22 @@ from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
 from tools._helpers import get_bot, run_async
+from tools._inline_index import get_result_index
+from tools._scheduler import INTERACTIVE
 import logging
-import json
 
 logger = logging.getLogger(__name__)
 
+# Telegram stops accepting answers to an inline query after about 10 seconds
+INLINE_ANSWER_TIMEOUT = 10
+
 
 class AnswerInlineQueryTool(Tool):
     def _invoke(
             self, tool_parameters: dict[str, Any]
     ) -> Generator[ToolInvokeMessage, None, None]:
         """
-        Answer an inline query
+        Answer an inline query with the page of results matching its text
         """
         try:
             # Get parameters
@@ -23,6 +27,8 @@ class AnswerInlineQueryTool(Tool):
             cache_time = tool_parameters.get("cache_time", 300)
             is_personal = tool_parameters.get("is_personal", False)
             next_offset = tool_parameters.get("next_offset")
+            query = tool_parameters.get("query") or ""
+            offset = tool_parameters.get("offset") or ""
 
             # Validate inputs
             if not inline_query_id:
@@ -33,39 +39,23 @@ class AnswerInlineQueryTool(Tool):
                 yield self.create_text_message("❌ Error: results are required")
                 return
 
-            # Parse results if string
-            if isinstance(results, str):
-                try:
-                    results_list = json.loads(results)
-                except:
-                    yield self.create_text_message("❌ Error: results must be valid JSON array")
-                    return
-            else:
-                results_list = results
+            # Index the corpus (reused while the same results keep coming in)
+            try:
+                index, index_cached = get_result_index(results)
+            except ValueError as e:
+                yield self.create_text_message(f"❌ Error: invalid results ({str(e)})")
+                return
+
+            # Results matching the query text, one page of at most 50 at a time
+            inline_results, auto_next_offset, total, page_cached = index.page(query, offset)
+            if next_offset is None or next_offset == "":
+                next_offset = auto_next_offset
 
             # Get bot instance
             bot = get_bot(self.runtime.credentials)
 
             # Answer inline query
             async def answer():
-                from telegram import InlineQueryResultArticle, InputTextMessageContent
-
-                # Convert results to InlineQueryResult objects
-                inline_results = []
-                for idx, result in enumerate(results_list):
-                    if result.get("type") == "article":
-                        inline_results.append(
-                            InlineQueryResultArticle(
-                                id=result.get("id", str(idx)),
-                                title=result.get("title", ""),
-                                input_message_content=InputTextMessageContent(
-                                    message_text=result.get("message_text", "")
-                                ),
-                                description=result.get("description"),
-                                thumb_url=result.get("thumb_url")
-                            )
-                        )
-
                 result = await bot.answer_inline_query(
                     inline_query_id=inline_query_id,
                     results=inline_results,
@@ -75,20 +65,26 @@ class AnswerInlineQueryTool(Tool):
                 )
                 return result
 
-            result = run_async(answer())
+            result = run_async(answer(), timeout=INLINE_ANSWER_TIMEOUT, priority=INTERACTIVE)
 
             if result:
                 yield self.create_text_message(
                     f"✅ Inline query answered successfully!\n"
                     f"Query ID: {inline_query_id}\n"
-                    f"Results: {len(results_list)}\n"
+                    f"Results: {len(inline_results)} of {total} matching ({len(index)} total)\n"
+                    f"Next Offset: {next_offset or 'None (last page)'}\n"
                     f"Cache Time: {cache_time}s"
                 )
 
                 yield self.create_json_message({
                     "success": True,
                     "inline_query_id": inline_query_id,
-                    "results_count": len(results_list),
+                    "results_count": len(inline_results),
+                    "total_matches": total,
+                    "corpus_size": len(index),
+                    "next_offset": next_offset,
+                    "index_cached": index_cached,
+                    "page_cached": page_cached,
                     "cache_time": cache_time
                 })
             else:
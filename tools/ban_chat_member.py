@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async
+from tools._helpers import get_bot, run_async, invalidate_member_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -47,6 +47,8 @@ class BanChatMemberTool(Tool):
             result = run_async(ban())
 
             if result:
+                invalidate_member_cache(bot, chat_id, user_id)
+
                 ban_type = "permanently" if not until_date else f"until {until_date}"
                 messages_action = " (all messages deleted)" if revoke_messages else ""
 
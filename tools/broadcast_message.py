@@ -0,0 +1,147 @@
+from collections.abc import Generator
+from typing import Any
+from dify_plugin import Tool
+from dify_plugin.entities.tool import ToolInvokeMessage
+from tools._helpers import get_bot, iter_async, parse_id_list
+from tools._retry import request_deadline
+from tools._scheduler import BULK
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 20
+MAX_CONCURRENCY = 30
+# Seconds between progress messages
+PROGRESS_INTERVAL = 2.0
+# A broadcast outlives a single request budget but not this; chats not reached by then are reported as failed
+MAX_BROADCAST_DURATION = 1800
+BROADCAST_TIMEOUT_ERROR = "Broadcast time limit reached before this chat was sent to"
+
+
+class BroadcastMessageTool(Tool):
+    def _invoke(
+            self, tool_parameters: dict[str, Any]
+    ) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        Send the same text message to many Telegram chats concurrently
+        """
+        try:
+            # Get parameters
+            chat_ids_param = tool_parameters.get("chat_ids")
+            text = tool_parameters.get("text")
+            parse_mode = tool_parameters.get("parse_mode") or None
+            disable_web_page_preview = tool_parameters.get("disable_web_page_preview", False)
+            disable_notification = tool_parameters.get("disable_notification", False)
+            max_concurrency = int(tool_parameters.get("max_concurrency") or DEFAULT_CONCURRENCY)
+
+            # Validate inputs
+            try:
+                chat_ids = parse_id_list(chat_ids_param)
+            except ValueError:
+                yield self.create_text_message("❌ Error: chat_ids must be a JSON array or a comma/newline separated list")
+                return
+
+            if not chat_ids:
+                yield self.create_text_message("❌ Error: chat_ids is required")
+                return
+
+            if not text:
+                yield self.create_text_message("❌ Error: text is required")
+                return
+
+            max_concurrency = max(1, min(max_concurrency, MAX_CONCURRENCY))
+
+            # Get bot instance
+            bot = get_bot(self.runtime.credentials)
+
+            async def deliver(chat_id: str):
+                try:
+                    message = await bot.send_message(
+                        chat_id=chat_id,
+                        text=text,
+                        parse_mode=parse_mode,
+                        disable_web_page_preview=disable_web_page_preview,
+                        disable_notification=disable_notification
+                    )
+                    return chat_id, message.message_id, None
+                except Exception as e:
+                    return chat_id, None, str(e)
+
+            # Deliver with max_concurrency workers pulling from one recipient
+            # iterator (paced by the bot's rate limiter) and report whatever
+            # finished every PROGRESS_INTERVAL seconds
+            async def broadcast():
+                recipients = iter(chat_ids)
+                results = []
+                deadline = time.monotonic() + MAX_BROADCAST_DURATION
+
+                async def worker():
+                    # Each step of iter_async has its own budget; the workers
+                    # span all of them, bounded by the broadcast's deadline
+                    request_deadline.set(deadline)
+                    for chat_id in recipients:
+                        if time.monotonic() >= deadline:
+                            results.append((chat_id, None, BROADCAST_TIMEOUT_ERROR))
+                        else:
+                            results.append(await deliver(chat_id))
+
+                pending = {asyncio.ensure_future(worker()) for _ in range(min(max_concurrency, len(chat_ids)))}
+                try:
+                    while pending:
+                        done, pending = await asyncio.wait(pending, timeout=PROGRESS_INTERVAL)
+                        for task in done:
+                            task.result()
+                        batch, results = results, []
+                        yield batch
+                finally:
+                    for task in pending:
+                        task.cancel()
+
+            started = time.monotonic()
+            message_ids = {}
+            errors = {}
+
+            for batch in iter_async(broadcast(), priority=BULK):
+                for chat_id, message_id, error in batch:
+                    if error:
+                        errors[chat_id] = error
+                    else:
+                        message_ids[chat_id] = message_id
+
+                if batch and len(message_ids) + len(errors) < len(chat_ids):
+                    yield self.create_text_message(
+                        f"📤 Progress: {len(message_ids) + len(errors)}/{len(chat_ids)} "
+                        f"(sent: {len(message_ids)}, failed: {len(errors)})\n"
+                    )
+
+            elapsed = round(time.monotonic() - started, 2)
+
+            # Report in recipient order rather than completion order
+            message_ids = {chat_id: message_ids[chat_id] for chat_id in chat_ids if chat_id in message_ids}
+            errors = {chat_id: errors[chat_id] for chat_id in chat_ids if chat_id in errors}
+
+            yield self.create_text_message(
+                f"{'✅' if not errors else '⚠️'} Broadcast finished!\n"
+                f"Recipients: {len(chat_ids)}\n"
+                f"Sent: {len(message_ids)}\n"
+                f"Failed: {len(errors)}\n"
+                f"Time: {elapsed}s"
+            )
+
+            yield self.create_json_message({
+                "success": not errors,
+                "total": len(chat_ids),
+                "sent_count": len(message_ids),
+                "failed_count": len(errors),
+                "elapsed_seconds": elapsed,
+                "message_ids": message_ids,
+                "errors": errors,
+                # Since the bot was started, across all its tools: shows whether sends are queueing up
+                "rate_limit": bot.rate_limiter.stats()
+            })
+
+        except Exception as e:
+            logger.error(f"Error broadcasting message: {str(e)}")
+            yield self.create_text_message(f"❌ Error: {str(e)}")
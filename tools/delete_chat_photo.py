@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, format_message_result, invalidate_chat_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,6 +27,8 @@ class DeleteChatPhotoTool(Tool):
             result = run_async(delete())
 
             if result:
+                invalidate_chat_cache(bot, chat_id)
+
                 yield self.create_text_message(
                     f"✅ Chat photo deleted successfully!\n"
                     f"Chat ID: {chat_id}"
@@ -2,36 +2,56 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async
+from tools._helpers import get_bot, run_async, parse_message_ids, chunked, BULK_CHUNK_SIZE
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# deleteMessages requests in flight at once
+BULK_CONCURRENCY = 5
+
 
 class DeleteMessageTool(Tool):
     def _invoke(
             self, tool_parameters: dict[str, Any]
     ) -> Generator[ToolInvokeMessage, None, None]:
         """
-        Delete a message from a chat
+        Delete a message, or many messages at once, from a chat
         """
         try:
             # Get parameters
             chat_id = tool_parameters.get("chat_id")
             message_id = tool_parameters.get("message_id")
+            message_ids_param = tool_parameters.get("message_ids")
 
             # Validate inputs
             if not chat_id:
                 yield self.create_text_message("❌ Error: chat_id is required")
                 return
 
-            if not message_id:
-                yield self.create_text_message("❌ Error: message_id is required")
+            if not message_id and not message_ids_param:
+                yield self.create_text_message("❌ Error: message_id or message_ids is required")
+                return
+
+            try:
+                message_ids = parse_message_ids(message_ids_param)
+            except ValueError as e:
+                yield self.create_text_message(f"❌ Error: invalid message_ids - {str(e)}")
                 return
 
+            if message_id and int(message_id) not in message_ids:
+                message_ids.insert(0, int(message_id))
+
             # Get bot instance
             bot = get_bot(self.runtime.credentials)
 
+            if len(message_ids) > 1:
+                yield from self._delete_many(bot, chat_id, message_ids)
+                return
+
+            message_id = message_ids[0]
+
             # Delete message
             async def delete():
                 result = await bot.delete_message(
@@ -60,3 +80,54 @@ class DeleteMessageTool(Tool):
         except Exception as e:
             logger.error(f"Error deleting message: {str(e)}")
             yield self.create_text_message(f"❌ Error: {str(e)}")
+
+    def _delete_many(self, bot, chat_id, message_ids: list[int]) -> Generator[ToolInvokeMessage, None, None]:
+        """Delete messages with deleteMessages, 100 ids per request, several requests in parallel"""
+        chunks = chunked(message_ids, BULK_CHUNK_SIZE)
+
+        async def delete_all():
+            semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+            async def delete_chunk(chunk):
+                async with semaphore:
+                    return await bot.delete_messages(chat_id=chat_id, message_ids=chunk)
+
+            return await asyncio.gather(*(delete_chunk(chunk) for chunk in chunks), return_exceptions=True)
+
+        results = run_async(delete_all())
+
+        failed = [
+            {
+                "first_message_id": chunk[0],
+                "last_message_id": chunk[-1],
+                "count": len(chunk),
+                "error": str(result) if isinstance(result, Exception) else "Request returned false"
+            }
+            for chunk, result in zip(chunks, results)
+            if result is not True
+        ]
+        processed = len(message_ids) - sum(item["count"] for item in failed)
+
+        if failed:
+            yield self.create_text_message(
+                f"⚠️ Bulk delete finished with errors\n"
+                f"Chat ID: {chat_id}\n"
+                f"Processed: {processed}/{len(message_ids)} messages\n"
+                f"Failed requests: {len(failed)}/{len(chunks)}"
+            )
+        else:
+            yield self.create_text_message(
+                f"✅ Messages deleted successfully!\n"
+                f"Chat ID: {chat_id}\n"
+                f"Messages: {len(message_ids)}\n"
+                f"Requests: {len(chunks)}"
+            )
+
+        yield self.create_json_message({
+            "success": not failed,
+            "chat_id": chat_id,
+            "requested_count": len(message_ids),
+            "processed_count": processed,
+            "requests": len(chunks),
+            "failed": failed
+        })
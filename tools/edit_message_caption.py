@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, format_message_result, edit_if_changed
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,9 +27,8 @@ class EditMessageCaptionTool(Tool):
             bot = get_bot(self.runtime.credentials)
 
             async def edit():
-                message = await bot.edit_message_caption(
-                    chat_id=chat_id,
-                    message_id=message_id,
+                message = await edit_if_changed(
+                    bot, "edit_message_caption", chat_id, message_id,
                     caption=caption,
                     parse_mode=parse_mode
                 )
@@ -37,7 +36,19 @@ class EditMessageCaptionTool(Tool):
 
             result = run_async(edit())
 
-            if result:
+            if result is None:
+                yield self.create_text_message(
+                    f"ℹ️ Caption already up to date, edit skipped\n"
+                    f"Message ID: {message_id}\n"
+                    f"Chat ID: {chat_id}"
+                )
+                yield self.create_json_message({
+                    "success": True,
+                    "modified": False,
+                    "message_id": message_id,
+                    "chat_id": chat_id
+                })
+            elif result:
                 message_data = format_message_result(result)
                 yield self.create_text_message(
                     f"✅ Caption edited successfully!\n"
@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, format_message_result, edit_if_changed
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,11 +39,10 @@ class EditMessageTextTool(Tool):
             # Get bot instance
             bot = get_bot(self.runtime.credentials)
 
-            # Edit message
+            # Edit message, unless it already shows exactly this text
             async def edit():
-                message = await bot.edit_message_text(
-                    chat_id=chat_id,
-                    message_id=message_id,
+                message = await edit_if_changed(
+                    bot, "edit_message_text", chat_id, message_id,
                     text=text,
                     parse_mode=parse_mode,
                     disable_web_page_preview=disable_web_page_preview
@@ -52,7 +51,19 @@ class EditMessageTextTool(Tool):
 
             result = run_async(edit())
 
-            if result:
+            if result is None:
+                yield self.create_text_message(
+                    f"ℹ️ Message already up to date, edit skipped\n"
+                    f"Message ID: {message_id}\n"
+                    f"Chat ID: {chat_id}"
+                )
+                yield self.create_json_message({
+                    "success": True,
+                    "modified": False,
+                    "message_id": message_id,
+                    "chat_id": chat_id
+                })
+            elif result:
                 # Format response
                 message_data = format_message_result(result)
 
@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, format_message_result, parse_message_ids, relay_messages, MAX_RELAY_IDS
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,13 +13,14 @@ class ForwardMessageTool(Tool):
             self, tool_parameters: dict[str, Any]
     ) -> Generator[ToolInvokeMessage, None, None]:
         """
-        Forward a message from one chat to another
+        Forward a message, or a batch of messages, from one chat to another
         """
         try:
             # Get parameters
             chat_id = tool_parameters.get("chat_id")
             from_chat_id = tool_parameters.get("from_chat_id")
             message_id = tool_parameters.get("message_id")
+            message_ids_param = tool_parameters.get("message_ids")
             disable_notification = tool_parameters.get("disable_notification", False)
             protect_content = tool_parameters.get("protect_content", False)
 
@@ -32,13 +33,30 @@ class ForwardMessageTool(Tool):
                 yield self.create_text_message("❌ Error: from_chat_id is required")
                 return
 
-            if not message_id:
-                yield self.create_text_message("❌ Error: message_id is required")
+            if not message_id and not message_ids_param:
+                yield self.create_text_message("❌ Error: message_id or message_ids is required")
                 return
 
+            try:
+                message_ids = parse_message_ids(message_ids_param, limit=MAX_RELAY_IDS)
+            except ValueError as e:
+                yield self.create_text_message(f"❌ Error: invalid message_ids - {str(e)}")
+                return
+
+            if message_id and int(message_id) not in message_ids:
+                message_ids.append(int(message_id))
+
             # Get bot instance
             bot = get_bot(self.runtime.credentials)
 
+            if len(message_ids) > 1:
+                yield from self._forward_many(
+                    bot, chat_id, from_chat_id, message_ids, disable_notification, protect_content
+                )
+                return
+
+            message_id = message_ids[0]
+
             # Forward message
             async def forward():
                 message = await bot.forward_message(
@@ -71,3 +89,40 @@ class ForwardMessageTool(Tool):
         except Exception as e:
             logger.error(f"Error forwarding message: {str(e)}")
             yield self.create_text_message(f"❌ Error: {str(e)}")
+
+    def _forward_many(self, bot, chat_id, from_chat_id, message_ids: list[int],
+                      disable_notification: bool, protect_content: bool) -> Generator[ToolInvokeMessage, None, None]:
+        """Forward messages with forwardMessages in ascending id order, reporting progress per request"""
+        processed, new_ids, error = 0, [], None
+        for processed, new_ids, error in relay_messages(
+                bot, "forward_messages", chat_id, from_chat_id, message_ids,
+                disable_notification=disable_notification,
+                protect_content=protect_content
+        ):
+            if error is None and processed < len(message_ids):
+                yield self.create_text_message(f"📤 Progress: {processed}/{len(message_ids)}\n")
+
+        if error:
+            yield self.create_text_message(
+                f"⚠️ Batch forward stopped early: {error}\n"
+                f"Forwarded: {len(new_ids)}/{len(message_ids)}\n"
+                f"To Chat: {chat_id}\n"
+                f"From Chat: {from_chat_id}"
+            )
+        else:
+            yield self.create_text_message(
+                f"✅ Messages forwarded successfully!\n"
+                f"Forwarded: {len(new_ids)}/{len(message_ids)}\n"
+                f"To Chat: {chat_id}\n"
+                f"From Chat: {from_chat_id}"
+            )
+
+        yield self.create_json_message({
+            "success": error is None,
+            "chat_id": chat_id,
+            "from_chat_id": from_chat_id,
+            "requested_count": len(message_ids),
+            "processed_count": processed,
+            "message_ids": new_ids,
+            "error": error
+        })
@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_chat_result
+from tools._helpers import get_bot, run_async, format_chat_result, get_chat_cached, get_member_count_cached
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +18,7 @@ class GetChatTool(Tool):
         try:
             # Get parameters
             chat_id = tool_parameters.get("chat_id")
+            max_age = tool_parameters.get("max_age")
 
             # Validate inputs
             if not chat_id:
@@ -27,14 +28,14 @@ class GetChatTool(Tool):
             # Get bot instance
             bot = get_bot(self.runtime.credentials)
 
-            # Get chat info
+            # Get chat info (served from the shared cache when fresh enough)
             async def get_info():
-                chat = await bot.get_chat(chat_id=chat_id)
+                chat = await get_chat_cached(bot, chat_id, max_age=max_age)
                 # Also get member count if it's a group/channel
                 members_count = None
                 if chat.type in ['group', 'supergroup', 'channel']:
                     try:
-                        members_count = await bot.get_chat_member_count(chat_id=chat_id)
+                        members_count = await get_member_count_cached(bot, chat_id, max_age=max_age)
                     except:
                         pass
                 return chat, members_count
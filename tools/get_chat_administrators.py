@@ -2,11 +2,24 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_user_result
+from tools._helpers import get_bot, run_async, format_user_result, get_admins_cached
 import logging
 
 logger = logging.getLogger(__name__)
 
+ADMIN_PERMISSIONS = (
+    'can_manage_chat', 'can_delete_messages', 'can_manage_video_chats', 'can_restrict_members',
+    'can_promote_members', 'can_change_info', 'can_invite_users', 'can_pin_messages',
+    'can_post_messages', 'can_edit_messages'
+)
+
+
+def has_permission(member, permission: str) -> bool:
+    """The chat creator holds every permission; administrators only those granted"""
+    if member.status == 'creator':
+        return True
+    return member.status == 'administrator' and bool(getattr(member, permission, False))
+
 
 class GetChatAdministratorsTool(Tool):
     def _invoke(
@@ -18,21 +31,36 @@ class GetChatAdministratorsTool(Tool):
         try:
             # Get parameters
             chat_id = tool_parameters.get("chat_id")
+            user_id = tool_parameters.get("user_id")
+            permission = tool_parameters.get("permission")
+            max_age = tool_parameters.get("max_age")
 
             # Validate inputs
             if not chat_id:
                 yield self.create_text_message("❌ Error: chat_id is required")
                 return
 
+            if permission:
+                permission = permission.strip()
+                if not permission.startswith('can_'):
+                    permission = f"can_{permission}"
+                if permission not in ADMIN_PERMISSIONS:
+                    yield self.create_text_message(
+                        f"❌ Error: unknown permission '{permission}', expected one of: {', '.join(ADMIN_PERMISSIONS)}"
+                    )
+                    return
+
             # Get bot instance
             bot = get_bot(self.runtime.credentials)
 
-            # Get administrators
-            async def get_admins():
-                admins = await bot.get_chat_administrators(chat_id=chat_id)
-                return admins
+            # Get administrators (served from the shared cache when fresh enough)
+            admins = run_async(get_admins_cached(bot, chat_id, max_age=max_age))
 
-            result = run_async(get_admins())
+            if user_id:
+                yield from self._check_user(chat_id, int(user_id), permission, admins)
+                return
+
+            result = list(admins.values())
 
             if result:
                 # Format response
@@ -51,16 +79,7 @@ class GetChatAdministratorsTool(Tool):
                     # Add permissions for administrators
                     if admin.status == 'administrator':
                         admin_data['permissions'] = {
-                            'can_manage_chat': getattr(admin, 'can_manage_chat', False),
-                            'can_delete_messages': getattr(admin, 'can_delete_messages', False),
-                            'can_manage_video_chats': getattr(admin, 'can_manage_video_chats', False),
-                            'can_restrict_members': getattr(admin, 'can_restrict_members', False),
-                            'can_promote_members': getattr(admin, 'can_promote_members', False),
-                            'can_change_info': getattr(admin, 'can_change_info', False),
-                            'can_invite_users': getattr(admin, 'can_invite_users', False),
-                            'can_pin_messages': getattr(admin, 'can_pin_messages', False),
-                            'can_post_messages': getattr(admin, 'can_post_messages', False),
-                            'can_edit_messages': getattr(admin, 'can_edit_messages', False)
+                            name: getattr(admin, name, False) for name in ADMIN_PERMISSIONS
                         }
 
                     admin_list.append(admin_data)
@@ -100,3 +119,28 @@ class GetChatAdministratorsTool(Tool):
         except Exception as e:
             logger.error(f"Error getting administrators: {str(e)}")
             yield self.create_text_message(f"❌ Error: {str(e)}")
+
+    def _check_user(self, chat_id, user_id: int, permission, admins: dict):
+        """Answer whether user_id is an administrator (with the given permission) from the roster"""
+        admin = admins.get(user_id)
+        is_admin = admin is not None
+        allowed = has_permission(admin, permission) if is_admin and permission else is_admin
+
+        if not is_admin:
+            yield self.create_text_message(f"👤 User {user_id} is not an administrator of chat {chat_id}")
+        elif permission:
+            verdict = "has" if allowed else "does not have"
+            yield self.create_text_message(
+                f"{'✅' if allowed else '🚫'} User {user_id} ({admin.status}) {verdict} {permission} in chat {chat_id}"
+            )
+        else:
+            yield self.create_text_message(f"✅ User {user_id} is {admin.status} of chat {chat_id}")
+
+        yield self.create_json_message({
+            "chat_id": chat_id,
+            "user_id": user_id,
+            "is_admin": is_admin,
+            "status": admin.status if is_admin else None,
+            "permission": permission,
+            "allowed": allowed
+        })
@@ -2,11 +2,43 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_user_result
+from tools._helpers import get_bot, run_async, format_user_result, get_member_cached, parse_id_list
+from tools._rate_limit import TokenBucket
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+MAX_BATCH_MEMBERS = 1000
+LOOKUP_CONCURRENCY = 10
+# getChatMember isn't one of the rate-limited sends, so a batch paces its own
+# lookups: a full batch of uncached members takes about 50 seconds
+LOOKUP_RATE = 20.0
+
+STATUS_EMOJI = {
+    'creator': '👑',
+    'administrator': '⭐',
+    'member': '👤',
+    'restricted': '🚫',
+    'left': '👋',
+    'kicked': '⛔'
+}
+
+
+def parse_member_targets(value, default_chat_id) -> list[tuple[str, int]]:
+    """
+    Parse (chat_id, user_id) pairs from a list of user ids, where an item may
+    also be "chat_id:user_id" to look the user up in another chat
+    """
+    targets = []
+    for item in parse_id_list(value):
+        chat_id, _, user_id = item.rpartition(':')
+        chat_id = chat_id or default_chat_id
+        if not chat_id:
+            raise ValueError(f"no chat_id given for user {user_id}")
+        targets.append((chat_id, int(user_id)))
+    return list(dict.fromkeys(targets))
+
 
 class GetChatMemberTool(Tool):
     def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage, None, None]:
@@ -14,6 +46,22 @@ class GetChatMemberTool(Tool):
         try:
             chat_id = tool_parameters.get("chat_id")
             user_id = tool_parameters.get("user_id")
+            user_ids_param = tool_parameters.get("user_ids")
+            max_age = tool_parameters.get("max_age")
+
+            if user_ids_param:
+                try:
+                    targets = parse_member_targets(user_ids_param, chat_id)
+                except ValueError as e:
+                    yield self.create_text_message(f"❌ Error: invalid user_ids ({str(e)})")
+                    return
+                if len(targets) > MAX_BATCH_MEMBERS:
+                    yield self.create_text_message(f"❌ Error: at most {MAX_BATCH_MEMBERS} members can be looked up per call")
+                    return
+                if targets:
+                    bot = get_bot(self.runtime.credentials)
+                    yield from self._get_many(bot, targets, max_age)
+                    return
 
             if not chat_id:
                 yield self.create_text_message("❌ Error: chat_id is required")
@@ -24,11 +72,7 @@ class GetChatMemberTool(Tool):
 
             bot = get_bot(self.runtime.credentials)
 
-            async def get_member():
-                member = await bot.get_chat_member(chat_id=chat_id, user_id=user_id)
-                return member
-
-            result = run_async(get_member())
+            result = run_async(get_member_cached(bot, chat_id, user_id, max_age=max_age))
 
             if result:
                 user_data = format_user_result(result.user)
@@ -50,14 +94,7 @@ class GetChatMemberTool(Tool):
                         "can_pin_messages": getattr(result, 'can_pin_messages', False)
                     }
 
-                status_emoji = {
-                    'creator': '👑',
-                    'administrator': '⭐',
-                    'member': '👤',
-                    'restricted': '🚫',
-                    'left': '👋',
-                    'kicked': '⛔'
-                }.get(result.status, '👤')
+                status_emoji = STATUS_EMOJI.get(result.status, '👤')
 
                 yield self.create_text_message(
                     f"✅ Member Information:\n"
@@ -73,3 +110,68 @@ class GetChatMemberTool(Tool):
         except Exception as e:
             logger.error(f"Error getting chat member: {str(e)}")
             yield self.create_text_message(f"❌ Error: {str(e)}")
+
+    def _get_many(self, bot, targets: list[tuple[str, int]], max_age) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        Look up many chat members concurrently, at most LOOKUP_RATE uncached
+        lookups per second, and summarize them as a compact table
+        """
+
+        async def get_all():
+            semaphore = asyncio.Semaphore(LOOKUP_CONCURRENCY)
+            bucket = TokenBucket(LOOKUP_RATE, LOOKUP_CONCURRENCY)
+
+            async def pace():
+                delay = bucket.reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+
+            async def get_one(target_chat_id, target_user_id):
+                async with semaphore:
+                    return await get_member_cached(
+                        bot, target_chat_id, target_user_id, max_age=max_age, pace=pace
+                    )
+
+            return await asyncio.gather(*(get_one(*target) for target in targets), return_exceptions=True)
+
+        results = run_async(get_all())
+
+        rows = []
+        status_counts = {}
+        for (target_chat_id, target_user_id), result in zip(targets, results):
+            row = {"chat_id": target_chat_id, "user_id": target_user_id}
+            if isinstance(result, Exception):
+                row["status"] = None
+                row["error"] = str(result)
+            else:
+                row["status"] = str(result.status)
+                row["username"] = result.user.username
+                row["name"] = result.user.full_name
+                row["until_date"] = result.until_date.isoformat() if getattr(result, 'until_date', None) else None
+                status_counts[row["status"]] = status_counts.get(row["status"], 0) + 1
+            rows.append(row)
+
+        failed_count = sum(1 for row in rows if row["status"] is None)
+        multiple_chats = len({target_chat_id for target_chat_id, _ in targets}) > 1
+
+        output = [
+            f"{'⚠️' if failed_count else '✅'} Members: {len(rows) - failed_count}/{len(rows)} resolved",
+            ", ".join(f"{STATUS_EMOJI.get(status, '👤')} {status}: {count}" for status, count in status_counts.items()),
+            ""
+        ]
+        for row in rows:
+            target = f"{row['chat_id']}:{row['user_id']}" if multiple_chats else str(row['user_id'])
+            if row["status"] is None:
+                output.append(f"❌ {target} | error: {row['error']}")
+            else:
+                username = f"@{row['username']}" if row['username'] else ''
+                output.append(f"{STATUS_EMOJI.get(row['status'], '👤')} {target} | {row['status']} | {row['name']} {username}".rstrip())
+
+        yield self.create_text_message("\n".join(output))
+        yield self.create_json_message({
+            "success": failed_count == 0,
+            "total": len(rows),
+            "failed_count": failed_count,
+            "status_counts": status_counts,
+            "members": rows
+        })
@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, get_member_count_cached
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,6 +13,7 @@ class GetChatMembersCountTool(Tool):
         """Get the number of members in a chat"""
         try:
             chat_id = tool_parameters.get("chat_id")
+            max_age = tool_parameters.get("max_age")
 
             if not chat_id:
                 yield self.create_text_message("❌ Error: chat_id is required")
@@ -21,7 +22,7 @@ class GetChatMembersCountTool(Tool):
             bot = get_bot(self.runtime.credentials)
 
             async def get_count():
-                count = await bot.get_chat_member_count(chat_id=chat_id)
+                count = await get_member_count_cached(bot, chat_id, max_age=max_age)
                 return count
 
             result = run_async(get_count())
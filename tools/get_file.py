@@ -2,29 +2,38 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, iter_async, create_blob_chunks, get_file_cached, MAX_DOWNLOAD_SIZE
+from tools._file_cache import file_cache
 import logging
+import mimetypes
+import os
+import tempfile
 
 logger = logging.getLogger(__name__)
 
+# Downloads are buffered in memory up to this size, then on disk
+SPOOL_MEMORY_SIZE = 1024 * 1024
+
 
 class GetFileTool(Tool):
     def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage, None, None]:
-        """Get basic info about a file and prepare it for downloading"""
+        """Get basic info about a file and optionally stream its content"""
         try:
             file_id = tool_parameters.get("file_id")
+            download = tool_parameters.get("download", False)
+            max_size_mb = tool_parameters.get("max_size_mb")
 
             if not file_id:
                 yield self.create_text_message("❌ Error: file_id is required")
                 return
 
-            bot = get_bot(self.runtime.credentials)
+            max_size = MAX_DOWNLOAD_SIZE
+            if max_size_mb:
+                max_size = min(int(float(max_size_mb) * 1024 * 1024), MAX_DOWNLOAD_SIZE)
 
-            async def get():
-                file = await bot.get_file(file_id=file_id)
-                return file
+            bot = get_bot(self.runtime.credentials)
 
-            result = run_async(get())
+            result = run_async(get_file_cached(bot, file_id))
 
             if result:
                 file_data = {
@@ -34,16 +43,86 @@ class GetFileTool(Tool):
                     "file_path": result.file_path
                 }
 
-                yield self.create_text_message(
-                    f"✅ File info retrieved successfully!\n"
-                    f"File ID: {result.file_id}\n"
-                    f"Size: {result.file_size:,} bytes\n"
-                    f"Path: {result.file_path}"
-                )
-                yield self.create_json_message(file_data)
+                if not download:
+                    yield self.create_text_message(
+                        f"✅ File info retrieved successfully!\n"
+                        f"File ID: {result.file_id}\n"
+                        f"Size: {result.file_size:,} bytes\n"
+                        f"Path: {result.file_path}"
+                    )
+                    yield self.create_json_message(file_data)
+                    return
+
+                if result.file_size and result.file_size > max_size:
+                    yield self.create_text_message(
+                        f"❌ Error: file is {result.file_size:,} bytes, larger than the {max_size:,} byte download limit"
+                    )
+                    return
+
+                yield from self._stream_file(bot, result, max_size)
+                yield self.create_json_message({**file_data, "downloaded": True})
             else:
                 yield self.create_text_message("❌ Failed to get file info")
 
         except Exception as e:
             logger.error(f"Error getting file: {str(e)}")
             yield self.create_text_message(f"❌ Error: {str(e)}")
+
+    def _stream_file(self, bot, file, max_size: int) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        Emit the file's content as blob chunks, from the on-disk cache when this
+        file_unique_id was downloaded before, else once it is downloaded (and cached)
+        """
+        filename = os.path.basename(file.file_path or "") or file.file_unique_id
+        meta = {
+            "mime_type": mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            "filename": filename
+        }
+        cached_size = file_cache.size_of(file.file_unique_id)
+        size = cached_size if cached_size is not None else file.file_size
+
+        yield self.create_text_message(
+            f"✅ {'Reading cached file' if cached_size is not None else 'Downloading file'}...\n"
+            f"File ID: {file.file_id}\n"
+            f"Name: {filename}\n"
+            f"Size: {f'{size:,} bytes' if size else 'unknown'}"
+        )
+
+        if cached_size is not None:
+            yield from create_blob_chunks(file_cache.iter_blocks(file.file_unique_id), cached_size, meta)
+            return
+
+        # Store the whole download before the first chunk goes out: once chunks are
+        # sent, a download failing part way would reach the caller as a truncated
+        # file that looks complete
+        blocks = iter_async(bot.iter_file(file.file_path))
+        if file_cache.enabled:
+            # The cache file is the only copy; blobs are read back from it once committed
+            with file_cache.writer(file.file_unique_id) as writer:
+                for block in blocks:
+                    writer.write(block)
+                    if writer.size > max_size:
+                        raise ValueError(f"file is larger than the {max_size:,} byte download limit")
+                self._check_length(file, writer.size)
+                if writer.commit():
+                    content = file_cache.iter_blocks(file.file_unique_id)
+                else:
+                    content = writer.iter_written()
+                yield from create_blob_chunks(content, writer.size, meta)
+            return
+
+        # No cache: spool the download, in memory up to SPOOL_MEMORY_SIZE, then on disk
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_SIZE) as spool:
+            for block in blocks:
+                spool.write(block)
+                if spool.tell() > max_size:
+                    raise ValueError(f"file is larger than the {max_size:,} byte download limit")
+            total_length = spool.tell()
+            self._check_length(file, total_length)
+            spool.seek(0)
+            yield from create_blob_chunks(iter(lambda: spool.read(SPOOL_MEMORY_SIZE), b""), total_length, meta)
+
+    @staticmethod
+    def _check_length(file, length: int) -> None:
+        if file.file_size and length != file.file_size:
+            raise ValueError(f"download ended after {length:,} of {file.file_size:,} bytes")
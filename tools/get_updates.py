@@ -0,0 +1,115 @@
+from collections.abc import Generator
+from typing import Any
+from dify_plugin import Tool
+from dify_plugin.entities.tool import ToolInvokeMessage
+from telegram import Update
+from telegram.error import Conflict
+from tools._helpers import get_bot, run_async, parse_id_list
+from tools._updates import poll_updates, compact_update, update_offsets, MAX_UPDATES_PER_BATCH, MAX_POLL_TIMEOUT
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCHES = 50
+# Updates listed in the text summary; the JSON always has all of them
+SUMMARY_LINES = 20
+
+
+class GetUpdatesTool(Tool):
+    def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage, None, None]:
+        """Receive pending updates by long polling"""
+        try:
+            # Get parameters
+            timeout = int(tool_parameters.get("timeout") or 0)
+            limit = int(tool_parameters.get("limit") or MAX_UPDATES_PER_BATCH)
+            max_batches = int(tool_parameters.get("max_batches") or 1)
+            allowed_updates = tool_parameters.get("allowed_updates")
+            full = tool_parameters.get("format") == "full"
+            offset = tool_parameters.get("offset")
+
+            # Validate inputs
+            if not 0 <= timeout <= MAX_POLL_TIMEOUT:
+                yield self.create_text_message(f"❌ Error: timeout must be between 0 and {MAX_POLL_TIMEOUT} seconds")
+                return
+
+            if not 1 <= limit <= MAX_UPDATES_PER_BATCH:
+                yield self.create_text_message(f"❌ Error: limit must be between 1 and {MAX_UPDATES_PER_BATCH}")
+                return
+
+            if not 1 <= max_batches <= MAX_BATCHES:
+                yield self.create_text_message(f"❌ Error: max_batches must be between 1 and {MAX_BATCHES}")
+                return
+
+            allowed_updates_list = None
+            if allowed_updates:
+                try:
+                    allowed_updates_list = parse_id_list(allowed_updates)
+                except ValueError:
+                    yield self.create_text_message("❌ Error: allowed_updates must be a JSON array or a comma-separated list")
+                    return
+                unknown = [kind for kind in allowed_updates_list if kind not in Update.ALL_TYPES]
+                if unknown:
+                    yield self.create_text_message(
+                        f"❌ Error: unknown update types: {', '.join(unknown)}\n"
+                        f"Valid types: {', '.join(Update.ALL_TYPES)}"
+                    )
+                    return
+
+            if offset is not None and offset != "":
+                offset = int(offset)
+            else:
+                offset = None
+
+            # Get bot instance
+            bot = get_bot(self.runtime.credentials)
+
+            try:
+                updates, next_offset, batches, drained = run_async(poll_updates(
+                    bot,
+                    timeout=timeout,
+                    limit=limit,
+                    allowed_updates=allowed_updates_list,
+                    max_batches=max_batches,
+                    offset=offset
+                ))
+            except Conflict as e:
+                yield self.create_text_message(
+                    f"❌ Error: {str(e)}\n"
+                    f"Updates can't be polled while a webhook is set; delete the webhook first"
+                )
+                return
+
+            compact = [compact_update(update) for update in updates]
+            lines = []
+            for item in compact[:SUMMARY_LINES]:
+                content = item.get("text") or item.get("data") or item.get("query") or item.get("media") or item.get("status") or ""
+                lines.append(
+                    f"• #{item['update_id']} {item['type']}"
+                    f"{' chat ' + str(item['chat_id']) if 'chat_id' in item else ''}"
+                    f"{' from ' + str(item['user_id']) if 'user_id' in item else ''}"
+                    f"{': ' + content[:50] if content else ''}"
+                )
+            if len(compact) > SUMMARY_LINES:
+                lines.append(f"… and {len(compact) - SUMMARY_LINES} more")
+
+            yield self.create_text_message(
+                f"{'✅' if updates else 'ℹ️'} Received {len(updates)} update(s) in {batches} batch(es)\n"
+                f"Next offset: {next_offset if next_offset is not None else 'None'}\n"
+                f"Backlog drained: {'Yes' if drained else 'No'}"
+                + ("\n" + "\n".join(lines) if lines else "")
+            )
+            yield self.create_json_message({
+                "success": True,
+                "count": len(updates),
+                "batches": batches,
+                "next_offset": next_offset,
+                "drained": drained,
+                "updates": [Update.de_json(update, bot).to_dict() for update in updates] if full else compact
+            })
+            # Only now are the updates delivered; the saved offset confirms them to Telegram on the next call
+            if next_offset is not None:
+                update_offsets.set(bot.key, next_offset)
+
+        except Exception as e:
+            logger.error(f"Error getting updates: {str(e)}")
+            yield self.create_text_message(f"❌ Error: {str(e)}")
@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, invalidate_member_cache, format_message_result
 import logging
 
 logger = logging.getLogger(__name__)
@@ -57,6 +57,8 @@ class RestrictChatMemberTool(Tool):
             result = run_async(restrict())
 
             if result:
+                invalidate_member_cache(bot, chat_id, user_id)
+
                 yield self.create_text_message(
                     f"✅ User restricted successfully!\n"
                     f"Chat ID: {chat_id}\n"
@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, send_media, format_message_result
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,8 +12,6 @@ class SendAnimationTool(Tool):
     def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage, None, None]:
         """Send animation (GIF or H.264/MPEG-4 AVC video without sound)"""
         try:
-            import os
-
             chat_id = tool_parameters.get("chat_id")
             animation = tool_parameters.get("animation")
             caption = tool_parameters.get("caption")
@@ -47,16 +45,7 @@ class SendAnimationTool(Tool):
                 if height:
                     kwargs["height"] = height
 
-                if animation.startswith('http://') or animation.startswith('https://'):
-                    kwargs["animation"] = animation
-                    message = await bot.send_animation(**kwargs)
-                elif os.path.isfile(animation):
-                    with open(animation, 'rb') as anim_file:
-                        kwargs["animation"] = anim_file
-                        message = await bot.send_animation(**kwargs)
-                else:
-                    kwargs["animation"] = animation
-                    message = await bot.send_animation(**kwargs)
+                message = await send_media(bot, "animation", animation, **kwargs)
 
                 return message
 
@@ -2,9 +2,8 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, send_media, format_message_result
 import logging
-import os
 
 logger = logging.getLogger(__name__)
 
@@ -54,19 +53,8 @@ class SendAudioTool(Tool):
                 if title:
                     kwargs["title"] = title
 
-                # Check if audio is a URL
-                if audio.startswith('http://') or audio.startswith('https://'):
-                    kwargs["audio"] = audio
-                    message = await bot.send_audio(**kwargs)
-                # Check if it's a local file
-                elif os.path.isfile(audio):
-                    with open(audio, 'rb') as audio_file:
-                        kwargs["audio"] = audio_file
-                        message = await bot.send_audio(**kwargs)
-                else:
-                    # Assume it's a file_id
-                    kwargs["audio"] = audio
-                    message = await bot.send_audio(**kwargs)
+                # URL, local file or file_id; uploads are cached by content
+                message = await send_media(bot, "audio", audio, **kwargs)
 
                 return message
 
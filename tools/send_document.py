@@ -2,7 +2,8 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, send_media, format_message_result
+from tools._proxy_upload import parse_source_headers, proxy_upload
 import logging
 import os
 
@@ -24,6 +25,8 @@ class SendDocumentTool(Tool):
             filename = tool_parameters.get("filename")
             parse_mode = tool_parameters.get("parse_mode") or None
             disable_notification = tool_parameters.get("disable_notification", False)
+            proxy = tool_parameters.get("proxy_upload", False)
+            source_headers = tool_parameters.get("source_headers")
 
             # Validate inputs
             if not chat_id:
@@ -34,42 +37,42 @@ class SendDocumentTool(Tool):
                 yield self.create_text_message("❌ Error: document is required")
                 return
 
+            if proxy and not document.startswith(('http://', 'https://')):
+                yield self.create_text_message("❌ Error: proxy upload requires the document to be a URL")
+                return
+
+            try:
+                source_headers = parse_source_headers(source_headers)
+            except ValueError:
+                yield self.create_text_message("❌ Error: source_headers must be a JSON object of string values")
+                return
+
             # Get bot instance
             bot = get_bot(self.runtime.credentials)
 
             # Send document
             async def send():
-                # Check if document is a URL
-                if document.startswith('http://') or document.startswith('https://'):
-                    message = await bot.send_document(
-                        chat_id=chat_id,
-                        document=document,
-                        caption=caption,
-                        parse_mode=parse_mode,
-                        disable_notification=disable_notification,
-                        filename=filename
-                    )
-                # Check if it's a local file
-                elif os.path.isfile(document):
-                    with open(document, 'rb') as doc_file:
-                        message = await bot.send_document(
-                            chat_id=chat_id,
-                            document=doc_file,
-                            caption=caption,
-                            parse_mode=parse_mode,
-                            disable_notification=disable_notification,
-                            filename=filename or os.path.basename(document)
-                        )
-                else:
-                    # Assume it's a file_id
-                    message = await bot.send_document(
+                if proxy:
+                    # Stream the URL's body through to Telegram
+                    return await proxy_upload(
+                        bot, "document", document,
+                        source_headers=source_headers,
+                        filename=filename,
                         chat_id=chat_id,
-                        document=document,
                         caption=caption,
                         parse_mode=parse_mode,
-                        disable_notification=disable_notification,
-                        filename=filename
+                        disable_notification=disable_notification
                     )
+
+                # URL, local file or file_id; uploads are cached by content
+                message = await send_media(
+                    bot, "document", document,
+                    chat_id=chat_id,
+                    caption=caption,
+                    parse_mode=parse_mode,
+                    disable_notification=disable_notification,
+                    filename=filename or (os.path.basename(document) if os.path.isfile(document) else None)
+                )
                 return message
 
             result = run_async(send())
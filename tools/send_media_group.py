@@ -2,21 +2,36 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, iter_async, chunked, file_id_cache, media_cache_key, extract_file_id
+from contextlib import ExitStack
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Telegram albums hold 2-10 items
+ALBUM_MAX_SIZE = 10
+MEDIA_TYPES = ("photo", "video")
+
+
+def split_albums(items: list) -> list[list]:
+    """Split items into albums of at most 10, never leaving a single-item album"""
+    albums = chunked(items, ALBUM_MAX_SIZE)
+    if len(albums) > 1 and len(albums[-1]) == 1:
+        albums[-1].insert(0, albums[-2].pop())
+    return albums
+
 
 class SendMediaGroupTool(Tool):
     def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage, None, None]:
-        """Send a group of photos or videos as an album"""
+        """Send any number of photos or videos as one or more albums"""
         try:
             import json
-            from telegram import InputMediaPhoto, InputMediaVideo
+            from telegram import InputFile, InputMediaPhoto, InputMediaVideo
 
             chat_id = tool_parameters.get("chat_id")
             media = tool_parameters.get("media")
+            upload_chat_id = tool_parameters.get("upload_chat_id")
             disable_notification = tool_parameters.get("disable_notification", False)
 
             if not chat_id:
@@ -36,52 +51,159 @@ class SendMediaGroupTool(Tool):
             else:
                 media_list = media
 
-            if len(media_list) < 2 or len(media_list) > 10:
-                yield self.create_text_message("❌ Error: media group must have 2-10 items")
+            if not isinstance(media_list, list) or not media_list:
+                yield self.create_text_message("❌ Error: media must be a non-empty JSON array")
                 return
 
+            for item in media_list:
+                if not isinstance(item, dict):
+                    yield self.create_text_message("❌ Error: every media item must be a JSON object")
+                    return
+                if not item.get("media") or not isinstance(item["media"], str):
+                    yield self.create_text_message("❌ Error: every media item needs a media value")
+                    return
+                if item.get("type", "photo") not in MEDIA_TYPES:
+                    yield self.create_text_message(f"❌ Error: unsupported media type {item.get('type')}")
+                    return
+
             bot = get_bot(self.runtime.credentials)
+            # Local files opened for the uploads, closed once everything is sent
+            open_files = ExitStack()
 
-            async def send():
-                # Convert to InputMedia objects
-                input_media = []
-                for item in media_list:
-                    media_type = item.get("type", "photo")
-                    media_url = item.get("media")
-                    caption = item.get("caption")
-
-                    if media_type == "photo":
-                        input_media.append(InputMediaPhoto(media=media_url, caption=caption))
-                    elif media_type == "video":
-                        input_media.append(InputMediaVideo(media=media_url, caption=caption))
-
-                messages = await bot.send_media_group(
-                    chat_id=chat_id,
-                    media=input_media,
-                    disable_notification=disable_notification
+            def resolve_media(media_ref, attach=False):
+                # Local files are attached as open handles that httpx streams in
+                # chunks (rewinding them on retries) instead of reading them into memory
+                if os.path.isfile(media_ref):
+                    return InputFile(
+                        open_files.enter_context(open(media_ref, 'rb')),
+                        filename=os.path.basename(media_ref), attach=attach, read_file_handle=False
+                    )
+                return media_ref
+
+            async def upload(item):
+                """Return the item's file_id, sending it to the staging chat unless cached"""
+                media_type = item.get("type", "photo")
+                media_ref = item["media"]
+                cache_key = await media_cache_key(bot, media_type, media_ref)
+                file_id = file_id_cache.get(cache_key) if cache_key else None
+                if file_id:
+                    return file_id, None
+
+                message = await self._send_single(
+                    bot, upload_chat_id, media_type, resolve_media(media_ref), None, True
                 )
-                return messages
+                file_id = extract_file_id(message, media_type)
+                if cache_key and file_id:
+                    file_id_cache.put(cache_key, file_id)
+                return file_id, message.message_id
 
-            result = run_async(send())
+            async def clean_up_staging(staging_ids):
+                for chunk in chunked(staging_ids, 100):
+                    try:
+                        await bot.delete_messages(chat_id=upload_chat_id, message_ids=chunk)
+                    except Exception as e:
+                        logger.warning(f"Failed to clean up staging messages: {str(e)}")
 
-            if result:
-                message_ids = [msg.message_id for msg in result]
+            def to_input_media(item):
+                media_class = InputMediaVideo if item.get("type", "photo") == "video" else InputMediaPhoto
+                return media_class(
+                    media=resolve_media(item["media"], attach=True),
+                    caption=item.get("caption"),
+                    parse_mode=item.get("parse_mode")
+                )
+
+            async def send():
+                """
+                Yield None after every staging upload and then the messages of each
+                album. Every item is its own iter_async step with its own deadline:
+                in a group, the rate limit lets only about 20 items out per minute
+                """
+                if upload_chat_id and len(media_list) > 1:
+                    # Upload local files and URLs one by one, then drop the staging messages.
+                    # Sends to the staging chat are delivered in order and paced by its rate
+                    # limit, so uploading them concurrently would gain nothing
+                    staging_ids = []
+                    try:
+                        for item in media_list:
+                            if os.path.isfile(item["media"]) or item["media"].startswith(('http://', 'https://')):
+                                item["media"], staging_id = await upload(item)
+                                if staging_id is not None:
+                                    staging_ids.append(staging_id)
+                                yield None
+                    finally:
+                        await clean_up_staging(staging_ids)
 
+                # A lone item can't form an album
+                if len(media_list) == 1:
+                    item = media_list[0]
+                    message = await self._send_single(
+                        bot, chat_id, item.get("type", "photo"), resolve_media(item["media"]),
+                        item.get("caption"), disable_notification
+                    )
+                    yield [message]
+                    return
+
+                # Albums go out one after another to keep their order in the chat
+                for album in split_albums(media_list):
+                    yield await bot.send_media_group(
+                        chat_id=chat_id,
+                        media=[to_input_media(item) for item in album],
+                        disable_notification=disable_notification
+                    )
+
+            album_count = len(split_albums(media_list)) if len(media_list) > 1 else 1
+            albums = []
+            error = None
+            with open_files:
+                try:
+                    for messages in iter_async(send()):
+                        if messages is None:
+                            continue
+                        albums.append([msg.message_id for msg in messages])
+                        if len(albums) < album_count:
+                            yield self.create_text_message(f"📤 Progress: {len(albums)}/{album_count} albums\n")
+                except Exception as e:
+                    # Albums already posted stay in the chat; report them with the error
+                    if not albums:
+                        raise
+                    logger.error(f"Error sending media group: {str(e)}")
+                    error = str(e)
+
+            message_ids = [message_id for album in albums for message_id in album]
+            if error:
                 yield self.create_text_message(
-                    f"✅ Media group sent successfully!\n"
+                    f"⚠️ Media group stopped early: {error}\n"
                     f"Chat ID: {chat_id}\n"
-                    f"Items: {len(result)}\n"
+                    f"Albums sent: {len(albums)}/{album_count}\n"
                     f"Message IDs: {', '.join(map(str, message_ids))}"
                 )
-                yield self.create_json_message({
-                    "success": True,
-                    "chat_id": chat_id,
-                    "message_ids": message_ids,
-                    "count": len(result)
-                })
             else:
-                yield self.create_text_message("❌ Failed to send media group")
+                yield self.create_text_message(
+                    f"✅ Media group sent successfully!\n"
+                    f"Chat ID: {chat_id}\n"
+                    f"Items: {len(message_ids)}\n"
+                    f"Albums: {len(albums)}\n"
+                    f"Message IDs: {', '.join(map(str, message_ids))}"
+                )
+            yield self.create_json_message({
+                "success": error is None,
+                "chat_id": chat_id,
+                "message_ids": message_ids,
+                "albums": albums,
+                "count": len(message_ids),
+                "error": error
+            })
 
         except Exception as e:
             logger.error(f"Error sending media group: {str(e)}")
             yield self.create_text_message(f"❌ Error: {str(e)}")
+
+    @staticmethod
+    async def _send_single(bot, chat_id, media_type, media, caption, disable_notification):
+        if media_type == "video":
+            return await bot.send_video(
+                chat_id=chat_id, video=media, caption=caption, disable_notification=disable_notification
+            )
+        return await bot.send_photo(
+            chat_id=chat_id, photo=media, caption=caption, disable_notification=disable_notification
+        )
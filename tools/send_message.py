@@ -3,6 +3,8 @@ from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
 from tools._helpers import get_bot, run_async, format_message_result
+from tools._text_split import split_text
+from tools._scheduler import INTERACTIVE
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,29 +38,69 @@ class SendMessageTool(Tool):
             # Get bot instance
             bot = get_bot(self.runtime.credentials)
 
+            # Texts over Telegram's limit are sent as several messages
+            try:
+                parts = split_text(text, parse_mode)
+            except ValueError as e:
+                yield self.create_text_message(f"❌ Error: {str(e)}")
+                return
+
             # Send message
             async def send():
-                message = await bot.send_message(
-                    chat_id=chat_id,
-                    text=text,
-                    parse_mode=parse_mode,
-                    disable_web_page_preview=disable_web_page_preview,
-                    disable_notification=disable_notification,
-                    reply_to_message_id=reply_to_message_id
-                )
-                return message
+                messages = []
+                for index, part in enumerate(parts):
+                    try:
+                        message = await bot.send_message(
+                            chat_id=chat_id,
+                            text=part,
+                            parse_mode=parse_mode,
+                            disable_web_page_preview=disable_web_page_preview,
+                            # Only the first part notifies and replies
+                            disable_notification=disable_notification or index > 0,
+                            reply_to_message_id=reply_to_message_id if index == 0 else None
+                        )
+                    except Exception as e:
+                        if not messages:
+                            raise
+                        return messages, e
+                    messages.append(message)
+                return messages, None
 
-            result = run_async(send())
+            # Replies are answers someone is waiting for; keep them ahead of bulk jobs
+            messages, error = run_async(send(), priority=INTERACTIVE if reply_to_message_id else None)
 
-            if result:
+            if messages:
                 # Format response
-                message_data = format_message_result(result)
+                message_data = format_message_result(messages[0])
+                message_ids = [message.message_id for message in messages]
+
+                if len(parts) == 1:
+                    yield self.create_text_message(
+                        f"✅ Message sent successfully!\n"
+                        f"Message ID: {message_data.get('message_id')}\n"
+                        f"Chat ID: {message_data.get('chat_id')}"
+                    )
+                elif error:
+                    logger.error(f"Error sending message part {len(messages) + 1}/{len(parts)}: {str(error)}")
+                    yield self.create_text_message(
+                        f"⚠️ Long message only partly sent: {len(messages)}/{len(parts)} parts\n"
+                        f"Message IDs: {', '.join(map(str, message_ids))}\n"
+                        f"Chat ID: {message_data.get('chat_id')}\n"
+                        f"Error: {str(error)}"
+                    )
+                else:
+                    yield self.create_text_message(
+                        f"✅ Long message sent in {len(parts)} parts!\n"
+                        f"Message IDs: {', '.join(map(str, message_ids))}\n"
+                        f"Chat ID: {message_data.get('chat_id')}"
+                    )
 
-                yield self.create_text_message(
-                    f"✅ Message sent successfully!\n"
-                    f"Message ID: {message_data.get('message_id')}\n"
-                    f"Chat ID: {message_data.get('chat_id')}"
-                )
+                if len(parts) > 1:
+                    message_data["success"] = error is None
+                    message_data["message_ids"] = message_ids
+                    message_data["part_count"] = len(parts)
+                    if error:
+                        message_data["error"] = str(error)
 
                 yield self.create_json_message(message_data)
             else:
@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, send_media, format_message_result
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,36 +37,14 @@ class SendPhotoTool(Tool):
 
             # Send photo
             async def send():
-                # Check if photo is a URL or file_id
-                if photo.startswith('http://') or photo.startswith('https://'):
-                    # Send from URL
-                    message = await bot.send_photo(
-                        chat_id=chat_id,
-                        photo=photo,
-                        caption=caption,
-                        parse_mode=parse_mode,
-                        disable_notification=disable_notification
-                    )
-                else:
-                    # Assume it's a file_id or local file path
-                    try:
-                        with open(photo, 'rb') as photo_file:
-                            message = await bot.send_photo(
-                                chat_id=chat_id,
-                                photo=photo_file,
-                                caption=caption,
-                                parse_mode=parse_mode,
-                                disable_notification=disable_notification
-                            )
-                    except FileNotFoundError:
-                        # Treat as file_id
-                        message = await bot.send_photo(
-                            chat_id=chat_id,
-                            photo=photo,
-                            caption=caption,
-                            parse_mode=parse_mode,
-                            disable_notification=disable_notification
-                        )
+                # URL, local file or file_id; uploads are cached by content
+                message = await send_media(
+                    bot, "photo", photo,
+                    chat_id=chat_id,
+                    caption=caption,
+                    parse_mode=parse_mode,
+                    disable_notification=disable_notification
+                )
                 return message
 
             result = run_async(send())
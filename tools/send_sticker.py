@@ -2,9 +2,8 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, send_media, format_message_result
 import logging
-import os
 
 logger = logging.getLogger(__name__)
 
@@ -43,19 +42,8 @@ class SendStickerTool(Tool):
                 if emoji:
                     kwargs["emoji"] = emoji
 
-                # Check if sticker is a URL
-                if sticker.startswith('http://') or sticker.startswith('https://'):
-                    kwargs["sticker"] = sticker
-                    message = await bot.send_sticker(**kwargs)
-                # Check if it's a local file
-                elif os.path.isfile(sticker):
-                    with open(sticker, 'rb') as sticker_file:
-                        kwargs["sticker"] = sticker_file
-                        message = await bot.send_sticker(**kwargs)
-                else:
-                    # Assume it's a file_id
-                    kwargs["sticker"] = sticker
-                    message = await bot.send_sticker(**kwargs)
+                # URL, local file or file_id; uploads are cached by content
+                message = await send_media(bot, "sticker", sticker, **kwargs)
 
                 return message
 
@@ -2,9 +2,9 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, send_media, format_message_result
+from tools._proxy_upload import parse_source_headers, proxy_upload
 import logging
-import os
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +27,8 @@ class SendVideoTool(Tool):
             supports_streaming = tool_parameters.get("supports_streaming", True)
             parse_mode = tool_parameters.get("parse_mode") or None
             disable_notification = tool_parameters.get("disable_notification", False)
+            proxy = tool_parameters.get("proxy_upload", False)
+            source_headers = tool_parameters.get("source_headers")
 
             # Validate inputs
             if not chat_id:
@@ -37,6 +39,16 @@ class SendVideoTool(Tool):
                 yield self.create_text_message("❌ Error: video is required")
                 return
 
+            if proxy and not video.startswith(('http://', 'https://')):
+                yield self.create_text_message("❌ Error: proxy upload requires the video to be a URL")
+                return
+
+            try:
+                source_headers = parse_source_headers(source_headers)
+            except ValueError:
+                yield self.create_text_message("❌ Error: source_headers must be a JSON object of string values")
+                return
+
             # Get bot instance
             bot = get_bot(self.runtime.credentials)
 
@@ -58,19 +70,12 @@ class SendVideoTool(Tool):
                 if height:
                     kwargs["height"] = height
 
-                # Check if video is a URL
-                if video.startswith('http://') or video.startswith('https://'):
-                    kwargs["video"] = video
-                    message = await bot.send_video(**kwargs)
-                # Check if it's a local file
-                elif os.path.isfile(video):
-                    with open(video, 'rb') as video_file:
-                        kwargs["video"] = video_file
-                        message = await bot.send_video(**kwargs)
-                else:
-                    # Assume it's a file_id
-                    kwargs["video"] = video
-                    message = await bot.send_video(**kwargs)
+                if proxy:
+                    # Stream the URL's body through to Telegram
+                    return await proxy_upload(bot, "video", video, source_headers=source_headers, **kwargs)
+
+                # URL, local file or file_id; uploads are cached by content
+                message = await send_media(bot, "video", video, **kwargs)
 
                 return message
 
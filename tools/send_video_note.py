@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, send_media, format_message_result
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,8 +12,6 @@ class SendVideoNoteTool(Tool):
     def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage, None, None]:
         """Send video note (round video message)"""
         try:
-            import os
-
             chat_id = tool_parameters.get("chat_id")
             video_note = tool_parameters.get("video_note")
             duration = tool_parameters.get("duration")
@@ -40,16 +38,7 @@ class SendVideoNoteTool(Tool):
                 if length:
                     kwargs["length"] = length
 
-                if video_note.startswith('http://') or video_note.startswith('https://'):
-                    kwargs["video_note"] = video_note
-                    message = await bot.send_video_note(**kwargs)
-                elif os.path.isfile(video_note):
-                    with open(video_note, 'rb') as vn_file:
-                        kwargs["video_note"] = vn_file
-                        message = await bot.send_video_note(**kwargs)
-                else:
-                    kwargs["video_note"] = video_note
-                    message = await bot.send_video_note(**kwargs)
+                message = await send_media(bot, "video_note", video_note, **kwargs)
 
                 return message
 
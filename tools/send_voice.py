@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, send_media, format_message_result
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,8 +12,6 @@ class SendVoiceTool(Tool):
     def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage, None, None]:
         """Send voice message"""
         try:
-            import os
-
             chat_id = tool_parameters.get("chat_id")
             voice = tool_parameters.get("voice")
             caption = tool_parameters.get("caption")
@@ -41,16 +39,7 @@ class SendVoiceTool(Tool):
                 if duration:
                     kwargs["duration"] = duration
 
-                if voice.startswith('http://') or voice.startswith('https://'):
-                    kwargs["voice"] = voice
-                    message = await bot.send_voice(**kwargs)
-                elif os.path.isfile(voice):
-                    with open(voice, 'rb') as voice_file:
-                        kwargs["voice"] = voice_file
-                        message = await bot.send_voice(**kwargs)
-                else:
-                    kwargs["voice"] = voice
-                    message = await bot.send_voice(**kwargs)
+                message = await send_media(bot, "voice", voice, **kwargs)
 
                 return message
 
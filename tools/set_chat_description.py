@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, format_message_result, invalidate_chat_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -31,6 +31,8 @@ class SetChatDescriptionTool(Tool):
             result = run_async(set_desc())
 
             if result:
+                invalidate_chat_cache(bot, chat_id)
+
                 yield self.create_text_message(
                     f"✅ Chat description updated successfully!\n"
                     f"Chat ID: {chat_id}"
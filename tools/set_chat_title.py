@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async
+from tools._helpers import get_bot, run_async, invalidate_chat_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -47,6 +47,8 @@ class SetChatTitleTool(Tool):
             result = run_async(set_title())
 
             if result:
+                invalidate_chat_cache(bot, chat_id)
+
                 yield self.create_text_message(
                     f"✅ Chat title updated successfully!\n"
                     f"Chat ID: {chat_id}\n"
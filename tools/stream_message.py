@@ -0,0 +1,72 @@
+from collections.abc import Generator
+from typing import Any
+from dify_plugin import Tool
+from dify_plugin.entities.tool import ToolInvokeMessage
+from tools._helpers import get_bot, run_async
+from tools._scheduler import INTERACTIVE
+from tools._stream import update_stream
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StreamMessageTool(Tool):
+    def _invoke(
+            self, tool_parameters: dict[str, Any]
+    ) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        Show text that arrives over several calls as one live-updating message
+        """
+        try:
+            # Get parameters
+            chat_id = tool_parameters.get("chat_id")
+            stream_id = tool_parameters.get("stream_id")
+            text = tool_parameters.get("text") or ""
+            replace = tool_parameters.get("mode") == "replace"
+            final = tool_parameters.get("final", False)
+            parse_mode = tool_parameters.get("parse_mode") or None
+            edit_interval = tool_parameters.get("edit_interval")
+            disable_notification = tool_parameters.get("disable_notification", False)
+
+            # Validate inputs
+            if not chat_id:
+                yield self.create_text_message("❌ Error: chat_id is required")
+                return
+
+            if not stream_id:
+                yield self.create_text_message("❌ Error: stream_id is required")
+                return
+
+            # Get bot instance
+            bot = get_bot(self.runtime.credentials)
+
+            # Returns as soon as the update is queued; edits happen in the background
+            stream, created = run_async(update_stream(
+                bot, str(stream_id), chat_id,
+                text=text,
+                replace=replace,
+                final=final,
+                parse_mode=parse_mode,
+                interval=float(edit_interval) if edit_interval else None,
+                disable_notification=disable_notification
+            ), priority=INTERACTIVE)
+
+            summary = stream.summary()
+            status = "finished" if final else ("started" if created else "updated")
+            yield self.create_text_message(
+                f"✅ Stream {status}!\n"
+                f"Stream ID: {stream_id}\n"
+                f"Chat ID: {chat_id}\n"
+                f"Message IDs: {', '.join(map(str, summary['message_ids']))}\n"
+                f"Length: {summary['length']} characters"
+            )
+            yield self.create_json_message({
+                "success": True,
+                "stream_id": stream_id,
+                "status": status,
+                **summary
+            })
+
+        except Exception as e:
+            logger.error(f"Error streaming message: {str(e)}")
+            yield self.create_text_message(f"❌ Error: {str(e)}")
@@ -2,7 +2,7 @@ from collections.abc import Generator
 from typing import Any
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from tools._helpers import get_bot, run_async, format_message_result
+from tools._helpers import get_bot, run_async, invalidate_member_cache, format_message_result
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,6 +36,8 @@ class UnbanChatMemberTool(Tool):
             result = run_async(unban())
 
             if result:
+                invalidate_member_cache(bot, chat_id, user_id)
+
                 yield self.create_text_message(
                     f"✅ User unbanned successfully!\n"
                     f"Chat ID: {chat_id}\n"
@@ -1,27 +1,84 @@
 import requests
-from typing import Any, Generator, List, Dict
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from typing import Any, Generator, Iterator, List, Dict, Optional, Tuple
 from dify_plugin.entities.tool import ToolInvokeMessage
 
+# Parallel downloads per call, also the size of the shared connection pool
+MAX_DOWNLOAD_WORKERS = 8
+# Responses larger than this are abandoned instead of buffered
+MAX_DOWNLOAD_BYTES = 10 * 1024 * 1024
+DOWNLOAD_TIMEOUT = 10
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Shared session, so downloads reuse keep-alive connections across calls"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_DOWNLOAD_WORKERS, pool_maxsize=MAX_DOWNLOAD_WORKERS)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def _download(url: str, max_bytes: int) -> Tuple[bytes, Optional[str]]:
+    """Stream a URL into memory, giving up as soon as it exceeds max_bytes"""
+    with _get_session().get(url, timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+
+        content_length = response.headers.get("Content-Length")
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            raise ValueError(f"response of {content_length} bytes exceeds the {max_bytes} byte limit")
+
+        content = bytearray()
+        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+            content += chunk
+            if len(content) > max_bytes:
+                raise ValueError(f"response exceeds the {max_bytes} byte limit")
+        return bytes(content), response.headers.get("Content-Type")
+
+
+def fetch_all(
+    urls: List[str], max_bytes: int = MAX_DOWNLOAD_BYTES
+) -> Iterator[Tuple[str, Future]]:
+    """
+    Download URLs concurrently, skipping empty and repeated ones. Yields
+    (url, future) pairs as each download finishes; future.result() returns
+    (content, content_type) or raises the download error.
+    """
+    unique_urls = list(dict.fromkeys(url for url in urls if url))
+    if not unique_urls:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=min(MAX_DOWNLOAD_WORKERS, len(unique_urls)))
+    try:
+        futures = {pool.submit(_download, url, max_bytes): url for url in unique_urls}
+        for future in as_completed(futures):
+            yield futures[future], future
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
 
 def process_images(
-    tool: Any, image_urls: List[str]
+    tool: Any, image_urls: List[str], max_bytes: int = MAX_DOWNLOAD_BYTES
 ) -> Generator[ToolInvokeMessage, None, None]:
-    """Downloads images from a list of URLs and yields them as tool messages."""
-    for image_url in image_urls:
-        if not image_url:
-            continue
-
+    """Downloads images from a list of URLs in parallel and yields them as tool messages as they arrive."""
+    for image_url, download in fetch_all(image_urls, max_bytes):
         try:
-            image_response = requests.get(image_url, timeout=10)
-            image_response.raise_for_status()
-
-            content_type = image_response.headers.get("Content-Type", "image/jpeg")
+            content, content_type = download.result()
             filename = image_url.split("/")[-1].split("?")[0]
 
             yield tool.create_blob_message(
-                blob=image_response.content,
+                blob=content,
                 meta={
-                    "mime_type": content_type,
+                    "mime_type": content_type or "image/jpeg",
                     "filename": filename,
                     "alt_text": "Tavily result image",
                 },
@@ -31,19 +88,20 @@ def process_images(
 
 
 def process_favicons(
-    tool: Any, results: List[Dict]
+    tool: Any, results: List[Dict], max_bytes: int = MAX_DOWNLOAD_BYTES
 ) -> Generator[ToolInvokeMessage, None, None]:
-    """Downloads favicons from results and yields them as tool messages."""
+    """Downloads favicons from results in parallel and yields them as tool messages as they arrive."""
+    # The first result using a favicon names it
+    first_result = {}
     for idx, result in enumerate(results):
-        if not result.get("favicon"):
-            continue
+        if result.get("favicon"):
+            first_result.setdefault(result["favicon"], (idx, result))
 
-        favicon_url = result["favicon"]
+    for favicon_url, download in fetch_all(list(first_result), max_bytes):
+        idx, result = first_result[favicon_url]
         try:
-            favicon_response = requests.get(favicon_url, timeout=10)
-            favicon_response.raise_for_status()
-
-            content_type = favicon_response.headers.get("Content-Type", "image/png")
+            content, content_type = download.result()
+            content_type = content_type or "image/png"
             filename = favicon_url.split("/")[-1].split("?")[0]
             if not filename or "." not in filename:
                 if "svg" in content_type:
@@ -63,7 +121,7 @@ def process_favicons(
                 f"Favicon for {result.get('title') or result.get('url', 'website')}"
             )
             yield tool.create_blob_message(
-                blob=favicon_response.content,
+                blob=content,
                 meta={
                     "mime_type": content_type,
                     "filename": filename,